@@ -0,0 +1,207 @@
+"""
+Групує схожі запити з журналу промахів FAQ (data/faq_misses.jsonl) і впорядковує
+групи за частотою: найчастіші групи - першочергові кандидати в нові питання FAQ.
+
+Запит описується множиною шинглів - перших --stem літер нормалізованих слів
+(грубе відкидання закінчень: "подключиться" і "подключение" дають один шингл;
+порядок слів у коротких запитах не враховується).
+Схожі множини шукаються через MinHash/LSH: підпис з bands * rows мінімальних
+хешів ділиться на смуги, запити зі збігом хоча б однієї смуги стають кандидатами,
+а запит приєднується до групи, якщо оцінка схожості Жаккара з її найчастішим
+запитом не нижча за --threshold.
+Із 20 смугами по 3 значення пару зі схожістю 0.5 стають кандидатами з імовірністю ~93%.
+
+Ротовані файли журналу (faq_misses.jsonl.1, .2, ...) читаються разом з ним.
+
+Запуск: python scripts/cluster_faq_misses.py [--log data/faq_misses.jsonl] [--since 2024-05-01] [--json]
+"""
+
+import argparse
+import json
+import random
+import sys
+import zlib
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.config import FAQ_MISS_LOG_PATH  # noqa: E402
+
+# Просте число Мерсенна 2^61 - 1 для універсального хешування
+PRIME = (1 << 61) - 1
+
+def log_files(path: Path) -> List[Path]:
+    """Журнал разом з ротованими файлами (path.1, path.2, ...), від найстарішого"""
+    rotated = []
+    i = 1
+    while path.with_name(f"{path.name}.{i}").is_file():
+        rotated.append(path.with_name(f"{path.name}.{i}"))
+        i += 1
+    return rotated[::-1] + ([path] if path.is_file() else [])
+
+def load_misses(path: Path, since: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Записи журналу та його ротованих файлів (не раніше дати since у форматі YYYY-MM-DD)"""
+    misses = []
+    for log_path in log_files(path):
+        with open(log_path, encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Останній рядок міг обірватися при аварійній зупинці бота
+                    print(f"{log_path}:{line_number}: invalid JSON, skipped", file=sys.stderr)
+                    continue
+                if since and entry.get("ts", "") < since:
+                    continue
+                misses.append(entry)
+    return misses
+
+def shingles(tokens: Sequence[str], stem: int) -> FrozenSet[str]:
+    """Основи слів запиту (перші stem літер; 0 - слова цілком)"""
+    return frozenset(token[:stem] if stem > 0 else token for token in tokens)
+
+class MinHasher:
+    """MinHash-підписи множин шинглів однаковими для всіх запитів хеш-функціями"""
+
+    def __init__(self, permutations: int, seed: int = 1):
+        rng = random.Random(seed)
+        self.coefficients = [(rng.randrange(1, PRIME), rng.randrange(PRIME)) for _ in range(permutations)]
+
+    def signature(self, items: FrozenSet[str]) -> Tuple[int, ...]:
+        hashes = [zlib.crc32(item.encode("utf-8")) for item in items]
+        return tuple(min((a * h + b) % PRIME for h in hashes) for a, b in self.coefficients)
+
+def _similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+    """Оцінка схожості Жаккара: частка однакових мінімальних хешів"""
+    return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+def cluster(signatures: List[Tuple[int, ...]], counts: List[int], bands: int, rows: int,
+            threshold: float) -> List[List[int]]:
+    """
+    Групи номерів підписів. Від найчастіших запитів до рідших: запит приєднується
+    до найсхожішого лідера групи серед кандидатів LSH або стає лідером нової групи.
+    Порівняння лише з лідером не дає групам розростатися ланцюжками.
+    """
+    buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+    groups: Dict[int, List[int]] = {}
+    for i in sorted(range(len(signatures)), key=lambda i: -counts[i]):
+        signature = signatures[i]
+        keys = [(band, signature[band * rows:(band + 1) * rows]) for band in range(bands)]
+        leaders = {leader for key in keys for leader in buckets.get(key, ())}
+        scored = [(_similarity(signature, signatures[leader]), -leader) for leader in leaders]
+        if scored and max(scored)[0] >= threshold:
+            groups[-max(scored)[1]].append(i)
+            continue
+        groups[i] = [i]
+        for key in keys:
+            buckets[key].append(i)
+    return list(groups.values())
+
+def build_report(misses: List[Dict[str, Any]], bands: int, rows: int, threshold: float, stem: int,
+                 min_size: int, top: int, samples: int, seed: int) -> Dict[str, Any]:
+    """Групи промахів за спаданням частоти"""
+    # Однакові набори шинглів хешуємо один раз
+    by_shingles: Dict[FrozenSet[str], List[Dict[str, Any]]] = defaultdict(list)
+    empty = 0
+    for entry in misses:
+        items = shingles(entry.get("tokens") or [], stem)
+        if items:
+            by_shingles[items].append(entry)
+        else:
+            empty += 1
+
+    keys = list(by_shingles)
+    hasher = MinHasher(bands * rows, seed)
+    signatures = [hasher.signature(items) for items in keys]
+
+    clusters = []
+    counts = [len(by_shingles[items]) for items in keys]
+    for group in cluster(signatures, counts, bands, rows, threshold):
+        entries = [entry for i in group for entry in by_shingles[keys[i]]]
+        if len(entries) < min_size:
+            continue
+        queries = Counter(entry["query"].strip() for entry in entries)
+        tokens = Counter(token for entry in entries for token in set(entry.get("tokens") or []))
+        best = Counter(entry["best"] for entry in entries if entry.get("best"))
+        timestamps = sorted(entry.get("ts", "") for entry in entries)
+        clusters.append({
+            "count": len(entries),
+            "query": queries.most_common(1)[0][0],
+            "tokens": [token for token, _ in tokens.most_common(5)],
+            "samples": [query for query, _ in queries.most_common(samples)],
+            "nearest_faq": [
+                {"question": question, "count": count} for question, count in best.most_common(3)
+            ],
+            "mean_score": round(sum(entry.get("score", 0.0) for entry in entries) / len(entries), 4),
+            "first_seen": timestamps[0],
+            "last_seen": timestamps[-1],
+        })
+    clusters.sort(key=lambda item: (-item["count"], item["query"]))
+
+    return {
+        "misses": len(misses),
+        "empty_queries": empty,
+        "distinct_queries": len(keys),
+        "clusters": len(clusters),
+        "top_clusters": clusters[:top] if top > 0 else clusters,
+    }
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"{report['misses']} misses, {report['distinct_queries']} distinct, "
+        f"{report['clusters']} clusters by frequency:"
+    ]
+    for rank, item in enumerate(report["top_clusters"], 1):
+        lines.append("")
+        lines.append(f"{rank}. [{item['count']}] {item['query']}")
+        lines.append(f"   words: {', '.join(item['tokens'])}")
+        for sample in item["samples"][1:]:
+            lines.append(f"   - {sample}")
+        if item["nearest_faq"]:
+            nearest = item["nearest_faq"][0]
+            lines.append(f"   nearest FAQ ({item['mean_score']:.2f} avg): {nearest['question']}")
+        lines.append(f"   seen {item['first_seen']} .. {item['last_seen']}")
+    return "\n".join(lines)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cluster FAQ misses to find missing FAQ entries")
+    parser.add_argument("--log", type=Path, default=Path(FAQ_MISS_LOG_PATH) if FAQ_MISS_LOG_PATH else None,
+                        help="miss log (default: data/faq_misses.jsonl)")
+    parser.add_argument("--since", help="only misses from this date on (YYYY-MM-DD)")
+    parser.add_argument("--threshold", type=float, default=0.5, help="minimal Jaccard similarity within a cluster")
+    parser.add_argument("--stem", type=int, default=5, help="letters of each word to compare (0 - whole words)")
+    parser.add_argument("--bands", type=int, default=20, help="LSH bands")
+    parser.add_argument("--rows", type=int, default=3, help="MinHash values per band")
+    parser.add_argument("--min-size", type=int, default=2, help="skip clusters with fewer misses")
+    parser.add_argument("--top", type=int, default=20, help="clusters to report (0 - all)")
+    parser.add_argument("--samples", type=int, default=3, help="distinct queries to show per cluster")
+    parser.add_argument("--seed", type=int, default=1, help="seed for MinHash permutations")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of text")
+    parser.add_argument("--output", type=Path, help="write the report here instead of stdout")
+    args = parser.parse_args()
+
+    # Порожній шлях (Path("") - це ".") означає вимкнений журнал, а не поточний каталог
+    if args.log is None or not str(args.log).strip() or args.log == Path("."):
+        sys.exit("FAQ_MISS_LOG_PATH is empty: the miss log is disabled (pass --log to read a file)")
+    if args.log.is_dir():
+        sys.exit(f"{args.log} is a directory, not a miss log")
+    if not log_files(args.log):
+        sys.exit(f"{args.log} not found: no misses recorded yet")
+
+    report = build_report(
+        load_misses(args.log, args.since), args.bands, args.rows, args.threshold, args.stem,
+        args.min_size, args.top, args.samples, args.seed
+    )
+    output = json.dumps(report, ensure_ascii=False, indent=2) if args.json else format_report(report)
+    if args.output:
+        args.output.write_text(output + "\n", encoding='utf-8')
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
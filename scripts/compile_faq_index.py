@@ -0,0 +1,82 @@
+"""
+Компілює data/faq.json у бінарний індекс data/faq.index, який бот відкриває
+через mmap замість розбору JSON і побудови індексу при кожному запуску.
+
+Індекс прив'язаний до mtime і розміру faq.json: після зміни FAQ бот
+повертається до JSON, доки індекс не скомпілюють знову. Словник опечаток
+компілюється для FAQ_MAX_EDIT_DISTANCE; з іншою відстанню бот будує його в пам'яті.
+
+Запуск: python scripts/compile_faq_index.py [--faq data/faq.json] [--output data/faq.index]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.config import FAQ_INDEX_PATH, FAQ_MAX_EDIT_DISTANCE  # noqa: E402
+from src.compiled_faq import CompiledFAQ, write_compiled_index  # noqa: E402
+from src.faq import FAQ_PATH, FAQIndex, _read_faq  # noqa: E402
+from src.ranking import numpy_available  # noqa: E402
+
+def differences(built: FAQIndex, compiled: FAQIndex) -> List[str]:
+    """Таблиці, у яких відкритий з файлу індекс не збігається з побудованим"""
+    failed = []
+    checks = {
+        "answers": lambda index: list(index.faq.items()),
+        "keys": lambda index: list(index.keys),
+        "generation": lambda index: index.generation,
+        "postings": lambda index: {word: list(ids) for word, ids in index.postings.items()},
+        "partitions": lambda index: {program: list(ids) for program, ids in index.partitions.items()},
+        "substrings": lambda index: {part: list(words) for part, words in index.substrings.items()},
+        "deletes": lambda index: {
+            variant: list(words) for variant, words in index.spelling.deletes.items()
+        } if index.spelling is not None else None,
+    }
+    for name, check in checks.items():
+        if check(built) != check(compiled):
+            failed.append(name)
+    if built.ranker is not None:
+        for name in ("idf", "term_ptr", "doc_ids", "weights"):
+            if getattr(built.ranker, name).tolist() != getattr(compiled.ranker, name).tolist():
+                failed.append(name)
+    for key in built.keys:
+        if built.search(key).matches != compiled.search(key).matches:
+            failed.append(f"search {key!r}")
+            break
+    return failed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compile the FAQ into a binary index")
+    parser.add_argument("--faq", type=Path, default=FAQ_PATH, help="FAQ file (default: data/faq.json)")
+    parser.add_argument("--output", type=Path, default=FAQ_INDEX_PATH, help="index file (default: data/faq.index)")
+    parser.add_argument("--max-edit-distance", type=int, default=FAQ_MAX_EDIT_DISTANCE,
+                        help="typo distance to compile the spelling index for (default: FAQ_MAX_EDIT_DISTANCE)")
+    args = parser.parse_args()
+
+    stat = args.faq.stat()
+    start = time.perf_counter()
+    # Нормалізація та злиття дублікатів - ті самі, що й при завантаженні JSON;
+    # масиви TF-IDF записуються завжди (якщо є NumPy), щоб FAQ_ENGINE можна було змінити
+    engine = "tfidf" if numpy_available() else "substring"
+    index = FAQIndex(_read_faq(args.faq), engine, args.max_edit_distance)
+    size = write_compiled_index(args.output, (stat.st_mtime_ns, stat.st_size), index)
+
+    # Перевіряємо, що записаний індекс читається і збігається з побудованим
+    compiled = FAQIndex({}, engine, args.max_edit_distance, compiled=CompiledFAQ(args.output))
+    failed = differences(index, compiled)
+    if failed:
+        sys.exit(f"Verification of {args.output} failed: {', '.join(failed)}")
+
+    print(
+        f"Compiled {len(index)} entries ({index.duplicates} duplicates merged, "
+        f"{len(index.postings)} words, {len(index.substrings)} substrings) into {args.output}: "
+        f"{size} bytes in {time.perf_counter() - start:.3f}s"
+    )
+
+if __name__ == "__main__":
+    main()
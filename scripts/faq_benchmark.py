@@ -0,0 +1,222 @@
+"""
+Офлайн-бенчмарк пошуку в FAQ: швидкість, пам'ять і якість кожного алгоритму.
+
+Корпус запитів складається з варіантів питань data/faq.json (нижній регістр,
+пропущене слово, опечатки, формат "Программа: проблема"), запитів без
+відповіді в FAQ і, за бажанням, записаних реальних запитів у форматі JSON Lines:
+
+    {"query": "не работает камера в мите", "expected": "google meet не работает камера"}
+    {"query": "где мой заказ", "expected": null}
+
+Результат друкується як JSON (або пишеться у файл --output), щоб порівнювати
+його між комітами.
+
+Запуск: python scripts/faq_benchmark.py [--queries data/faq_queries.jsonl] [--output result.json]
+"""
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.faq import FAQ_PATH, FAQIndex, _read_faq, preprocess_text  # noqa: E402
+from src.normalize import normalize_tokens  # noqa: E402
+from src.programs import PROGRAM_WORDS, programs_in  # noqa: E402
+from src.ranking import numpy_available  # noqa: E402
+
+THRESHOLDS = (0.3, 0.4, 0.5, 0.6, 0.7)
+
+# Запити, на які в FAQ відповіді немає (для частки хибних спрацювань)
+NEGATIVE_QUERIES = (
+    "привет как дела",
+    "где мой заказ",
+    "сколько стоит подписка",
+    "хочу оформить отпуск",
+    "когда будет зарплата",
+    "как поменять пароль от почты",
+    "нужен доступ к jira",
+    "забыл пропуск в офис",
+    "не приходит смс с кодом",
+    "как подключиться к vpn",
+    "кондиционер в офисе не включается",
+    "можно ли работать из дома",
+)
+
+# (запит, очікуване питання FAQ або None, тип запиту)
+Case = Tuple[str, Optional[str], str]
+
+def _typo(word: str, rng: random.Random) -> str:
+    """Переставляє дві сусідні літери або замінює одну"""
+    i = rng.randrange(1, len(word) - 1)
+    if rng.random() < 0.5:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word[:i] + rng.choice("аеиоу") + word[i + 1:]
+
+def generate_cases(faq: Dict[str, str], seed: int = 1) -> List[Case]:
+    """Варіанти кожного питання FAQ та запити без відповіді"""
+    rng = random.Random(seed)
+    cases: List[Case] = []
+    for key in faq:
+        words = key.split()
+        cases.append((key, key, "exact"))
+        cases.append((key.lower(), key, "lowercase"))
+        if len(words) > 2:
+            dropped = list(words)
+            del dropped[rng.randrange(len(dropped))]
+            cases.append((" ".join(dropped), key, "dropped_word"))
+        long_words = [i for i, word in enumerate(words) if len(word) >= 6]
+        if long_words:
+            typo = list(words)
+            i = rng.choice(long_words)
+            typo[i] = _typo(typo[i], rng)
+            cases.append((" ".join(typo), key, "typo"))
+        programs = programs_in(preprocess_text(key))
+        if programs:
+            problem = [word for word in normalize_tokens(key) if word not in PROGRAM_WORDS]
+            cases.append((f"{programs[0]}: {' '.join(problem)}", key, "program_prefix"))
+    cases.extend((query, None, "negative") for query in NEGATIVE_QUERIES)
+    return cases
+
+def load_recorded(path: Path, faq: Dict[str, str]) -> List[Case]:
+    """Записані реальні запити з очікуваним питанням (null - відповіді немає)"""
+    cases: List[Case] = []
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            expected = entry.get("expected")
+            if expected is not None and expected not in faq:
+                print(f"{path}:{line_number}: unknown FAQ key {expected!r}, skipped", file=sys.stderr)
+                continue
+            cases.append((entry["query"], expected, "recorded"))
+    return cases
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+def run_engine(engine: str, faq: Dict[str, str], cases: List[Case], k: int, repeat: int) -> Dict[str, Any]:
+    """Будує індекс заданим алгоритмом і проганяє по ньому всі запити"""
+    tracemalloc.start()
+    build_start = time.perf_counter()
+    index = FAQIndex(faq, engine)
+    build_time = time.perf_counter() - build_start
+    index_memory, build_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies: List[float] = []
+    results = []
+    for _ in range(repeat):
+        results = []
+        for query, expected, kind in cases:
+            start = time.perf_counter()
+            result = index.search(query, k)
+            latencies.append(time.perf_counter() - start)
+            results.append((expected, kind, result))
+
+    positives = [(expected, kind, result) for expected, kind, result in results if expected is not None]
+    negatives = [result for expected, _, result in results if expected is None]
+    # Очікуване питання могло злитися з дублікатом - тому порівнюємо відповіді
+    top1 = sum(1 for expected, _, result in positives if result.key and index.faq[result.key] == faq[expected])
+    topk = sum(
+        1 for expected, _, result in positives
+        if any(index.faq[key] == faq[expected] for _, key, _ in result.matches)
+    )
+    by_kind: Dict[str, List[int]] = {}
+    for expected, kind, result in positives:
+        correct = bool(result.key) and index.faq[result.key] == faq[expected]
+        by_kind.setdefault(kind, []).append(int(correct))
+
+    thresholds = {}
+    for threshold in THRESHOLDS:
+        answered_correct = sum(
+            1 for expected, _, result in positives
+            if result.score > threshold and index.faq[result.key] == faq[expected]
+        )
+        thresholds[str(threshold)] = {
+            # Частка запитів з відповіддю, на які бот відповів правильно
+            "recall": round(answered_correct / len(positives), 4) if positives else None,
+            # Частка запитів без відповіді, на які бот все одно відповів
+            "false_positive_rate": round(
+                sum(1 for result in negatives if result.score > threshold) / len(negatives), 4
+            ) if negatives else None,
+        }
+
+    latencies.sort()
+    total_time = sum(latencies)
+    return {
+        "engine": index.engine,
+        "entries": len(index),
+        "duplicates_merged": index.duplicates,
+        "vocabulary": len(index.postings),
+        "build_seconds": round(build_time, 6),
+        "index_memory_bytes": index_memory,
+        "build_peak_memory_bytes": build_peak,
+        "queries": len(latencies),
+        "throughput_qps": round(len(latencies) / total_time, 1) if total_time else None,
+        "latency_p50_us": round(_percentile(latencies, 0.5) * 1e6, 2),
+        "latency_p99_us": round(_percentile(latencies, 0.99) * 1e6, 2),
+        "top1_accuracy": round(top1 / len(positives), 4) if positives else None,
+        f"top{k}_accuracy": round(topk / len(positives), 4) if positives else None,
+        "top1_accuracy_by_kind": {kind: round(sum(hits) / len(hits), 4) for kind, hits in sorted(by_kind.items())},
+        "thresholds": thresholds,
+    }
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="FAQ matching benchmark")
+    parser.add_argument("--faq", type=Path, default=FAQ_PATH, help="FAQ file (default: data/faq.json)")
+    parser.add_argument("--queries", type=Path, help="recorded queries, JSON Lines with query/expected")
+    parser.add_argument("--engines", default="substring,tfidf", help="comma-separated engines to compare")
+    parser.add_argument("-k", type=int, default=3, help="candidates for top-k accuracy")
+    parser.add_argument("--repeat", type=int, default=20, help="passes over the corpus for timing")
+    parser.add_argument("--seed", type=int, default=1, help="seed for generated variants")
+    parser.add_argument("--output", type=Path, help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    faq = _read_faq(args.faq)
+    cases = generate_cases(faq, args.seed)
+    if args.queries:
+        cases.extend(load_recorded(args.queries, faq))
+
+    engines = [engine.strip() for engine in args.engines.split(",") if engine.strip()]
+    if "tfidf" in engines and not numpy_available():
+        print("NumPy is not installed, skipping the tfidf engine", file=sys.stderr)
+        engines.remove("tfidf")
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": time.time(),
+        "python": sys.version.split()[0],
+        "faq_entries": len(faq),
+        "cases": {
+            "positive": sum(1 for _, expected, _ in cases if expected is not None),
+            "negative": sum(1 for _, expected, _ in cases if expected is None),
+        },
+        "engines": {engine: run_engine(engine, faq, cases, args.k, args.repeat) for engine in engines},
+    }
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n", encoding='utf-8')
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
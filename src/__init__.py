@@ -5,6 +5,10 @@
 from .config import (
     BOT_TOKEN,
     BOT_NAME,
+    BOT_MODE,
+    METRICS_LOG_INTERVAL,
+    METRICS_ENABLED,
+    LOOP_LAG_INTERVAL,
     COMMANDS
 )
 
@@ -17,6 +21,7 @@ from .handlers import (
     handle_admin_request,
     handle_other_programs,
     handle_admin_reply,
+    handle_faq_choice,
     handle_rating
 )
 
@@ -27,6 +32,30 @@ from .texts import (
     TRACKER_ADMIN_CHAT_ID
 )
 
+from .faq import faq_store, shutdown_faq_executor
+
+from .ratings import ratings_writer, rating_stats
+
+from .misses import miss_log
+
+from .storage import create_storage
+
+from .routing import (
+    BUTTON_ROUTES,
+    ButtonFilter,
+    dispatch_button
+)
+
+from .webhook import run_webhook, check_webhook_config
+
+from .logging_setup import setup_logging
+
+from .metrics import bot_metrics, setup_metrics, log_metrics, monitor_loop_lag
+
+from .prometheus import render_metrics, start_metrics_server
+
+from .outbound import outbound_limiter, setup_outbound
+
 from .keyboards import (
     get_main_keyboard,
     get_yaware_keyboard,
@@ -40,6 +69,10 @@ from .keyboards import (
 __all__ = [
     'BOT_TOKEN',
     'BOT_NAME',
+    'BOT_MODE',
+    'METRICS_LOG_INTERVAL',
+    'METRICS_ENABLED',
+    'LOOP_LAG_INTERVAL',
     'COMMANDS',
     'cmd_start',
     'cmd_help',
@@ -49,11 +82,32 @@ __all__ = [
     'handle_admin_request',
     'handle_other_programs',
     'handle_admin_reply',
+    'handle_faq_choice',
     'handle_rating',
     'TEXTS',
     'DOWNLOAD_URLS',
     'ADMIN_CHAT_ID',
     'TRACKER_ADMIN_CHAT_ID',
+    'faq_store',
+    'shutdown_faq_executor',
+    'ratings_writer',
+    'rating_stats',
+    'miss_log',
+    'create_storage',
+    'BUTTON_ROUTES',
+    'ButtonFilter',
+    'dispatch_button',
+    'run_webhook',
+    'check_webhook_config',
+    'setup_logging',
+    'bot_metrics',
+    'setup_metrics',
+    'log_metrics',
+    'monitor_loop_lag',
+    'render_metrics',
+    'start_metrics_server',
+    'outbound_limiter',
+    'setup_outbound',
     'get_main_keyboard',
     'get_yaware_keyboard',
     'get_help_keyboard',
@@ -0,0 +1,358 @@
+"""
+Модуль зі скомпільованим бінарним індексом FAQ, що відкривається через mmap.
+
+Файл містить усе, що FAQIndex інакше будує при завантаженні: словник і postings,
+таблицю підрядків, словник видалень для виправлення опечаток, розділи програм
+та масиви TF-IDF. Завантаження лише відображає файл у пам'ять; таблиці читаються
+зі спільних сторінок файлу при зверненні, тож кілька процесів (зокрема процеси
+пулу пошуку) тримають індекс один раз.
+
+Формат (little-endian):
+    заголовок HEADER і каталог секцій (зміщення та розмір кожної, вирівняні на 8 байт)
+    хеш-таблиці "рядок -> масив uint32" (питання, слова, підрядки, видалення, розділи):
+        елементи: на кожен 4 x uint32 (зміщення і довжина ключа, початок і довжина значень)
+        значення: uint32
+        комірки: uint32 (номер елемента + 1, 0 - порожня), відкрита адресація за crc32 ключа
+    відповіді: на кожне питання 2 x uint32 (зміщення і довжина)
+    масиви TF-IDF (idf, term_ptr, doc_ids, weights) - як у TfidfRanker
+    рядки UTF-8
+"""
+
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if TYPE_CHECKING:
+    from .faq import FAQIndex
+
+MAGIC = b"FAQIDX03"
+# магія, mtime_ns і розмір faq.json, версія FAQ (faq_version), кількість питань,
+# злитих дублікатів, відстань словника видалень (0 - його немає), чи є масиви TF-IDF
+HEADER = struct.Struct("<8sqq8sIIII")
+TABLES = ("entries", "terms", "substrings", "deletes", "partitions")
+TFIDF_ARRAYS = (("idf", "<f8"), ("term_ptr", "<i8"), ("doc_ids", "<i8"), ("weights", "<f8"))
+SECTIONS = (
+    [f"{table}_{part}" for table in TABLES for part in ("items", "values", "slots")]
+    + ["answers"] + [name for name, _ in TFIDF_ARRAYS] + ["strings"]
+)
+DIRECTORY = struct.Struct(f"<{2 * len(SECTIONS)}Q")
+ITEM_FIELDS = 4
+
+def _uint32(values: Sequence[int]) -> bytes:
+    data = array("I", values)
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data.tobytes()
+
+class _StringWriter:
+    """Рядки UTF-8 файлу: однакові рядки (зокрема спільні відповіді) пишуться один раз"""
+
+    def __init__(self):
+        self.blob = bytearray()
+        self.offsets: Dict[str, Tuple[int, int]] = {}
+
+    def add(self, text: str) -> Tuple[int, int]:
+        if text not in self.offsets:
+            encoded = text.encode("utf-8")
+            self.offsets[text] = (len(self.blob), len(encoded))
+            self.blob.extend(encoded)
+        return self.offsets[text]
+
+def _table_sections(rows: Sequence[Tuple[str, Sequence[int]]], strings: _StringWriter) -> List[bytes]:
+    """Елементи, значення та комірки хеш-таблиці з рядків (ключ, значення) у заданому порядку"""
+    items: List[int] = []
+    values: List[int] = []
+    capacity = 1
+    while capacity < 2 * len(rows):
+        capacity *= 2
+    slots = [0] * capacity
+    for item_id, (key, row_values) in enumerate(rows):
+        items.extend(strings.add(key))
+        items.extend((len(values), len(row_values)))
+        values.extend(row_values)
+        slot = zlib.crc32(key.encode("utf-8")) & (capacity - 1)
+        while slots[slot]:
+            slot = (slot + 1) & (capacity - 1)
+        slots[slot] = item_id + 1
+    return [_uint32(items), _uint32(values), _uint32(slots)]
+
+def write_compiled_index(path: Path, source_signature: Tuple[int, int], index: "FAQIndex") -> int:
+    """
+    Записує побудований з JSON індекс у файл (через тимчасовий файл і атомарну
+    заміну). Масиви TF-IDF записуються, якщо індекс має ранжувальник. Повертає розмір
+    """
+    strings = _StringWriter()
+    term_ids = {word: term_id for term_id, word in enumerate(index.postings)}
+    spelling = index.spelling
+    tables: Dict[str, Sequence[Tuple[str, Sequence[int]]]] = {
+        "entries": [(key, [term_ids[word] for word in words]) for key, words in zip(index.keys, index.documents)],
+        "terms": list(index.postings.items()),
+        "substrings": [(part, [term_ids[word] for word in words]) for part, words in index.substrings.items()],
+        "deletes": [
+            (variant, [term_ids[word] for word in words]) for variant, words in spelling.deletes.items()
+        ] if spelling is not None else [],
+        "partitions": list(index.partitions.items()),
+    }
+    sections: Dict[str, bytes] = {}
+    for table, rows in tables.items():
+        for part, data in zip(("items", "values", "slots"), _table_sections(rows, strings)):
+            sections[f"{table}_{part}"] = data
+    answers: List[int] = []
+    for key in index.keys:
+        answers.extend(strings.add(index.faq[key]))
+    sections["answers"] = _uint32(answers)
+    ranker = index.ranker
+    for name, dtype in TFIDF_ARRAYS:
+        sections[name] = getattr(ranker, name).astype(dtype).tobytes() if ranker is not None else b""
+    sections["strings"] = bytes(strings.blob)
+
+    header = HEADER.pack(
+        MAGIC, source_signature[0], source_signature[1], index.generation.encode("ascii"),
+        len(index.keys), index.duplicates, spelling.max_distance if spelling is not None else 0,
+        int(ranker is not None)
+    )
+    directory: List[int] = []
+    offset = HEADER.size + DIRECTORY.size
+    for name in SECTIONS:
+        offset += -offset % 8
+        directory.extend((offset, len(sections[name])))
+        offset += len(sections[name])
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(header + DIRECTORY.pack(*directory))
+        for name in SECTIONS:
+            f.write(b"\0" * (-f.tell() % 8))
+            f.write(sections[name])
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return path.stat().st_size
+
+class CompiledTable(Mapping):
+    """Хеш-таблиця "рядок -> масив uint32" у файлі індексу; ключі декодуються при зверненні"""
+
+    def __init__(self, compiled: "CompiledFAQ", items: memoryview, values: memoryview, slots: memoryview):
+        self._compiled = compiled
+        self._items = items
+        self._values = values
+        self._slots = slots
+        self._mask = len(slots) - 1
+
+    def find(self, key: str) -> int:
+        """Номер елемента з ключем key або -1 (викликається для кожного підрядка запиту)"""
+        encoded = key.encode("utf-8")
+        length = len(encoded)
+        items, slots, mask = self._items, self._slots, self._mask
+        slot = zlib.crc32(encoded) & mask
+        item = slots[slot]
+        while item:
+            base = (item - 1) * ITEM_FIELDS
+            if items[base + 1] == length:
+                start = self._compiled.strings_offset + items[base]
+                if self._compiled.data[start:start + length] == encoded:
+                    return item - 1
+            slot = (slot + 1) & mask
+            item = slots[slot]
+        return -1
+
+    def key_at(self, item_id: int) -> str:
+        base = item_id * ITEM_FIELDS
+        return self._compiled.string(self._items[base], self._items[base + 1])
+
+    def values_at(self, item_id: int) -> memoryview:
+        base = item_id * ITEM_FIELDS
+        start = self._items[base + 2]
+        return self._values[start:start + self._items[base + 3]]
+
+    def __getitem__(self, key: str) -> memoryview:
+        item_id = self.find(key)
+        if item_id < 0:
+            raise KeyError(key)
+        return self.values_at(item_id)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.find(key) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.key_at(item_id) for item_id in range(len(self)))
+
+    def __len__(self) -> int:
+        return len(self._items) // ITEM_FIELDS
+
+class TableView(Mapping):
+    """Таблиця з перетворенням значень: convert отримує номер елемента"""
+
+    def __init__(self, table: CompiledTable, convert: Callable[[int], Any]):
+        self._table = table
+        self._convert = convert
+
+    def __getitem__(self, key: str) -> Any:
+        item_id = self._table.find(key)
+        if item_id < 0:
+            raise KeyError(key)
+        return self._convert(item_id)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._table
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table)
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+class CompiledKeys(Sequence):
+    """Питання FAQ за номерами (декодуються при зверненні)"""
+
+    def __init__(self, entries: CompiledTable):
+        self._entries = entries
+
+    def __getitem__(self, entry_id: int) -> str:
+        if not -len(self) <= entry_id < len(self):
+            raise IndexError(entry_id)
+        return self._entries.key_at(entry_id % len(self))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class CompiledAnswers(Mapping):
+    """Питання -> відповідь; відповіді декодуються з mmap при зверненні"""
+
+    def __init__(self, compiled: "CompiledFAQ"):
+        self._compiled = compiled
+        self._entries = compiled.tables["entries"]
+
+    def __getitem__(self, key: str) -> str:
+        entry_id = self._entries.find(key)
+        if entry_id < 0:
+            raise KeyError(key)
+        return self._compiled.answer(entry_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class CompiledFAQ:
+    """Відкритий через mmap скомпільований індекс"""
+
+    def __init__(self, path: Path):
+        if sys.byteorder != "little":
+            raise RuntimeError("compiled FAQ index requires a little-endian platform")
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.data = self._mmap
+        if len(self._mmap) < HEADER.size + DIRECTORY.size:
+            raise ValueError(f"{path} is truncated or corrupted")
+        (magic, mtime_ns, size, generation, self.entry_count, self.duplicates,
+         self.spelling_distance, has_tfidf) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a compiled FAQ index (or was built by another version)")
+        self.source_signature = (mtime_ns, size)
+        self.generation = generation.decode("ascii")
+        self.has_tfidf = bool(has_tfidf)
+
+        directory = DIRECTORY.unpack_from(self._mmap, HEADER.size)
+        self._sections: Dict[str, Tuple[int, int]] = {}
+        for i, name in enumerate(SECTIONS):
+            offset, length = directory[2 * i], directory[2 * i + 1]
+            if offset + length > len(self._mmap):
+                raise ValueError(f"{path} is truncated or corrupted")
+            self._sections[name] = (offset, length)
+
+        view = memoryview(self._mmap)
+
+        def uint32_section(name: str) -> memoryview:
+            offset, length = self._sections[name]
+            return view[offset:offset + length].cast("I")
+
+        self.tables: Dict[str, CompiledTable] = {
+            table: CompiledTable(self, *(uint32_section(f"{table}_{part}") for part in ("items", "values", "slots")))
+            for table in TABLES
+        }
+        self._answers = uint32_section("answers")
+        self.strings_offset = self._sections["strings"][0]
+        if len(self.tables["entries"]) != self.entry_count:
+            raise ValueError(f"{path} is truncated or corrupted")
+
+    def raw(self, offset: int, length: int) -> bytes:
+        start = self.strings_offset + offset
+        return self._mmap[start:start + length]
+
+    def string(self, offset: int, length: int) -> str:
+        return self.raw(offset, length).decode("utf-8")
+
+    def answer(self, entry_id: int) -> str:
+        return self.string(self._answers[2 * entry_id], self._answers[2 * entry_id + 1])
+
+    def keys(self) -> CompiledKeys:
+        return CompiledKeys(self.tables["entries"])
+
+    def answers(self) -> CompiledAnswers:
+        return CompiledAnswers(self)
+
+    def postings(self) -> CompiledTable:
+        """Слово -> номери питань"""
+        return self.tables["terms"]
+
+    def partitions(self) -> CompiledTable:
+        """Програма -> номери питань про неї"""
+        return self.tables["partitions"]
+
+    def _words(self, table: CompiledTable) -> TableView:
+        terms = self.tables["terms"]
+        return TableView(table, lambda item_id: [terms.key_at(t) for t in table.values_at(item_id)])
+
+    def substrings(self) -> TableView:
+        """Підрядок -> слова словника, які його містять"""
+        return self._words(self.tables["substrings"])
+
+    def deletes(self) -> TableView:
+        """Варіант з видаленими літерами -> слова словника (для spelling_distance)"""
+        return self._words(self.tables["deletes"])
+
+    def frequencies(self) -> TableView:
+        """Слово -> кількість питань з ним"""
+        terms = self.tables["terms"]
+        return TableView(terms, lambda item_id: len(terms.values_at(item_id)))
+
+    def term_ids(self) -> TableView:
+        """Слово -> номер слова (номер стовпця в масивах TF-IDF)"""
+        return TableView(self.tables["terms"], lambda item_id: item_id)
+
+    def documents(self) -> List[List[str]]:
+        """Слова кожного питання (декодуються всі одразу; для перевірки і TF-IDF без масивів)"""
+        entries, terms = self.tables["entries"], self.tables["terms"]
+        words = [terms.key_at(term_id) for term_id in range(len(terms))]
+        return [[words[t] for t in entries.values_at(entry_id)] for entry_id in range(len(entries))]
+
+    def tfidf_arrays(self) -> Optional[Dict[str, Any]]:
+        """Масиви TF-IDF без копіювання (None, якщо їх не записано або немає NumPy)"""
+        if not self.has_tfidf or np is None:
+            return None
+        arrays = {}
+        for name, dtype in TFIDF_ARRAYS:
+            offset, length = self._sections[name]
+            arrays[name] = np.frombuffer(self._mmap, dtype=dtype, count=length // 8, offset=offset)
+        return arrays
+
+def load_compiled_index(path: Path, source_signature: Optional[Tuple[int, int]]) -> Optional[CompiledFAQ]:
+    """Відкриває індекс, якщо він скомпільований з поточної версії faq.json, інакше None"""
+    if source_signature is None or not path.exists():
+        return None
+    compiled = CompiledFAQ(path)
+    if compiled.source_signature != tuple(source_signature):
+        return None
+    return compiled
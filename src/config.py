@@ -3,6 +3,7 @@
 """
 
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 from aiogram import types
 
@@ -13,6 +14,19 @@ load_dotenv()
 BOT_TOKEN = os.getenv("MAIN_BOT_TOKEN")
 BOT_NAME = os.getenv("MAIN_BOT_NAME")
 
+# Режим отримання оновлень: "polling" (long polling) або "webhook"
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+
+# Налаштування вебхука (використовуються лише при BOT_MODE=webhook)
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+# Скільки оновлень обробляється одночасно (і скільки з'єднань дозволяємо Telegram)
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
+HEALTH_PATH = os.getenv("HEALTH_PATH", "/health")
+
 # Опис команд бота
 COMMANDS = [
     types.BotCommand(command="start", description="Начать работу с ботом"),
@@ -33,4 +47,100 @@ for program_id, program_name in PROGRAM_COMMANDS.items():
             command=program_id,
                 description=f"Установить {program_name}"
         )
-    ) 
\ No newline at end of file
+    )
+
+# Інтервал перевірки змін файлу FAQ (секунди)
+FAQ_RELOAD_INTERVAL = float(os.getenv("FAQ_RELOAD_INTERVAL", "5"))
+# Скомпільований індекс FAQ (scripts/compile_faq_index.py); використовується, лише якщо
+# він зібраний з поточної версії faq.json
+FAQ_INDEX_PATH = Path(os.getenv(
+    "FAQ_INDEX_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "data", "faq.index")
+))
+# Алгоритм пошуку в FAQ: "substring" (частка слів запиту, знайдених у питанні) або "tfidf"
+FAQ_ENGINE = os.getenv("FAQ_ENGINE", "substring").lower()
+# Мінімальна оцінка (від 0 до 1), з якою відповідь з FAQ вважається знайденою
+FAQ_THRESHOLD = float(os.getenv("FAQ_THRESHOLD", "0.5"))
+# Скільки схожих питань пропонувати, якщо відповідь не знайдено (0 - не пропонувати), і з якої оцінки
+FAQ_SUGGESTIONS = int(os.getenv("FAQ_SUGGESTIONS", "3"))
+FAQ_SUGGESTION_THRESHOLD = float(os.getenv("FAQ_SUGGESTION_THRESHOLD", "0.3"))
+# Кеш результатів пошуку: скільки запитів тримати (0 - вимкнено) і скільки секунд
+FAQ_CACHE_SIZE = int(os.getenv("FAQ_CACHE_SIZE", "1024"))
+FAQ_CACHE_TTL = float(os.getenv("FAQ_CACHE_TTL", "600"))
+# З якої кількості питань пошук у FAQ виконується поза циклом подій,
+# у пулі потоків ("thread") чи процесів ("process") і скільки в ньому виконавців.
+# Процеси пулу ділять скомпільований індекс (FAQ_INDEX_PATH) через mmap; без нього
+# кожен процес тримає власну копію індексу, побудовану з JSON
+FAQ_OFFLOAD_THRESHOLD = int(os.getenv("FAQ_OFFLOAD_THRESHOLD", "2000"))
+FAQ_OFFLOAD_EXECUTOR = os.getenv("FAQ_OFFLOAD_EXECUTOR", "thread").lower()
+FAQ_OFFLOAD_WORKERS = int(os.getenv("FAQ_OFFLOAD_WORKERS", "2"))
+# Максимальна кількість опечаток у слові запиту, що виправляється (0 - не виправляти)
+FAQ_MAX_EDIT_DISTANCE = int(os.getenv("FAQ_MAX_EDIT_DISTANCE", "2"))
+# Журнал запитів без відповіді в FAQ (JSON Lines, для scripts/cluster_faq_misses.py);
+# порожнє значення вимикає журнал
+FAQ_MISS_LOG_PATH = os.getenv(
+    "FAQ_MISS_LOG_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "data", "faq_misses.jsonl")
+)
+# Буферизований запис журналу: розмір пакета та максимальна затримка запису (секунди)
+FAQ_MISS_LOG_BATCH_SIZE = int(os.getenv("FAQ_MISS_LOG_BATCH_SIZE", "50"))
+FAQ_MISS_LOG_FLUSH_INTERVAL = float(os.getenv("FAQ_MISS_LOG_FLUSH_INTERVAL", "30"))
+# Ротація журналу за розміром (як LOG_MAX_BYTES/LOG_BACKUP_COUNT): максимальний розмір
+# файлу в байтах (0 - без ротації) і скільки попередніх файлів (.1, .2, ...) зберігати
+FAQ_MISS_LOG_MAX_BYTES = int(os.getenv("FAQ_MISS_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+FAQ_MISS_LOG_BACKUP_COUNT = int(os.getenv("FAQ_MISS_LOG_BACKUP_COUNT", "3"))
+
+# FSM-сховище: "sqlite" (зберігається між перезапусками) або "memory"
+FSM_STORAGE = os.getenv("FSM_STORAGE", "sqlite").lower()
+FSM_DB_PATH = os.getenv(
+    "FSM_DB_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "data", "fsm.sqlite3")
+)
+# Через скільки секунд неактивності розмова вважається покинутою
+FSM_STATE_TTL = float(os.getenv("FSM_STATE_TTL", str(7 * 24 * 3600)))
+# Максимальна кількість розмов у кеші пам'яті
+FSM_CACHE_SIZE = int(os.getenv("FSM_CACHE_SIZE", "10000"))
+# Інтервал відкладеного запису змін у базу (секунди)
+FSM_FLUSH_INTERVAL = float(os.getenv("FSM_FLUSH_INTERVAL", "2"))
+
+# Скільки номерів звернень резервувати за одне звернення до файлу лічильника
+TICKET_BLOCK_SIZE = int(os.getenv("TICKET_BLOCK_SIZE", "10"))
+
+# Буферизований запис оцінок: розмір пакета та максимальна затримка запису (секунди)
+RATINGS_BATCH_SIZE = int(os.getenv("RATINGS_BATCH_SIZE", "50"))
+RATINGS_FLUSH_INTERVAL = float(os.getenv("RATINGS_FLUSH_INTERVAL", "5"))
+# Скільки останніх днів і годин зберігати в статистиці голосів за часом
+RATINGS_STATS_DAYS = int(os.getenv("RATINGS_STATS_DAYS", "30"))
+RATINGS_STATS_HOURS = int(os.getenv("RATINGS_STATS_HOURS", "48"))
+
+# Логування: рівень, формат ("text" або "json" - JSON-рядки) та ротація файлу
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+# "size" - за розміром, "time" - за часом, "none" - без ротації
+LOG_ROTATION = os.getenv("LOG_ROTATION", "size").lower()
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "midnight")
+
+# Ендпоінт метрик у форматі Prometheus: окремий сервер на METRICS_HOST:METRICS_PORT
+# (в обох режимах; на публічному сервері вебхука метрик немає)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() in ("1", "true", "yes")
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))
+METRICS_PATH = os.getenv("METRICS_PATH", "/metrics")
+
+# Як часто (секунди) писати в лог зведення затримок обробників; 0 - не писати
+METRICS_LOG_INTERVAL = float(os.getenv("METRICS_LOG_INTERVAL", "300"))
+# Як часто (секунди) вимірювати затримку циклу подій; 0 - не вимірювати
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))
+
+# Ліміти відправлення повідомлень (повідомлень за секунду та розмір пачки)
+OUTBOUND_GLOBAL_RATE = float(os.getenv("OUTBOUND_GLOBAL_RATE", "25"))
+OUTBOUND_GLOBAL_BURST = float(os.getenv("OUTBOUND_GLOBAL_BURST", "30"))
+OUTBOUND_CHAT_RATE = float(os.getenv("OUTBOUND_CHAT_RATE", "1"))
+OUTBOUND_CHAT_BURST = float(os.getenv("OUTBOUND_CHAT_BURST", "5"))
+# Групи (зокрема чати адміністраторів): близько 20 повідомлень за хвилину
+OUTBOUND_GROUP_RATE = float(os.getenv("OUTBOUND_GROUP_RATE", "0.33"))
+OUTBOUND_GROUP_BURST = float(os.getenv("OUTBOUND_GROUP_BURST", "5"))
+# Скільки разів повторювати запит після відповіді 429 (retry_after)
+OUTBOUND_MAX_RETRIES = int(os.getenv("OUTBOUND_MAX_RETRIES", "3"))
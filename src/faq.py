@@ -2,34 +2,71 @@
 Модуль для роботи з FAQ та номерами звернень.
 """
 
+import asyncio
+import hashlib
+import heapq
 import json
 import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, List, Tuple
-from difflib import get_close_matches
+from collections import Counter, OrderedDict
+from typing import Optional, Dict, List, Mapping, Sequence, Set, Tuple
+
+from .config import (
+    FAQ_RELOAD_INTERVAL,
+    FAQ_ENGINE,
+    FAQ_THRESHOLD,
+    FAQ_MAX_EDIT_DISTANCE,
+    FAQ_SUGGESTIONS,
+    FAQ_CACHE_SIZE,
+    FAQ_CACHE_TTL,
+    FAQ_OFFLOAD_THRESHOLD,
+    FAQ_OFFLOAD_EXECUTOR,
+    FAQ_OFFLOAD_WORKERS,
+    FAQ_INDEX_PATH
+)
+from .ranking import TfidfRanker, numpy_available
+from .spelling import SpellingIndex
+from .normalize import normalize_tokens, normalize_text
+from .programs import PROGRAM_WORDS, programs_in, split_program
+from .compiled_faq import CompiledFAQ, load_compiled_index
 
 # Визначаємо шляхи до файлів
 DATA_DIR = Path(__file__).parent.parent / "data"
 FAQ_PATH = DATA_DIR / "faq.json"
-TICKET_FILE = DATA_DIR / "ticket_counter.txt"
 
 # Створюємо директорію для даних, якщо її немає
 DATA_DIR.mkdir(exist_ok=True)
 
+def _read_faq(path: Path) -> Dict[str, str]:
+    """Читає та розбирає файл FAQ (помилки не перехоплюються)"""
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding='utf-8'))
+
+def faq_version(keys: List[str]) -> str:
+    """
+    Версія FAQ для номерів питань у кнопках: хеш списку питань індексу. Номери
+    питань залежать лише від цього списку, тож версія однакова після перезапуску
+    і в усіх процесах бота, а зміна самих відповідей кнопок не ламає.
+    """
+    return hashlib.blake2b("\0".join(keys).encode("utf-8"), digest_size=4).hexdigest()
+
 def load_faq() -> Dict[str, str]:
     """Завантажує FAQ з файлу"""
     try:
-        if not FAQ_PATH.exists():
-            return {}
-        return json.loads(FAQ_PATH.read_text(encoding='utf-8'))
+        return _read_faq(FAQ_PATH)
     except Exception as e:
         logging.error(f"Ошибка загрузки FAQ: {e}")
         return {}
 
 def preprocess_text(text: str) -> List[str]:
     """Підготовка тексту для пошуку"""
-    # Переводимо в нижній регістр і розбиваємо на слова
-    words = text.lower().split()
+    # Нижній регістр, розбиття на слова, українські літери та назви програм
+    words = normalize_tokens(text)
     # Видаляємо дуже короткі слова (артиклі, прийменники тощо)
     return [word for word in words if len(word) > 2]
 
@@ -49,48 +86,516 @@ def calculate_similarity(query_words: List[str], faq_words: List[str]) -> float:
     # Розраховуємо схожість як відношення знайдених слів до загальної кількості слів у запиті
     return matches / len(query_words)
 
-def find_best_match(question: str, faq: Dict[str, str]) -> Tuple[str, float]:
+def _substrings(word: str, min_length: int) -> Set[str]:
+    """Повертає всі підрядки слова довжиною не менше min_length"""
+    return {
+        word[i:j]
+        for i in range(len(word))
+        for j in range(i + min_length, len(word) + 1)
+    }
+
+class MatchResult:
+    """До k найкращих питань FAQ за спаданням оцінки: (номер питання, питання, оцінка)"""
+
+    __slots__ = ("generation", "matches", "faq")
+
+    def __init__(self, generation: str, matches: List[Tuple[int, str, float]], faq: Mapping[str, str]):
+        # Версія FAQ (faq_version), до якої належать номери питань
+        self.generation = generation
+        self.matches = matches
+        self.faq = faq
+
+    @property
+    def key(self) -> Optional[str]:
+        return self.matches[0][1] if self.matches else None
+
+    @property
+    def score(self) -> float:
+        return self.matches[0][2] if self.matches else 0.0
+
+    @property
+    def answer(self) -> Optional[str]:
+        """Відповідь на найкраще питання (з тієї версії FAQ, у якій шукали)"""
+        return self.faq[self.matches[0][1]] if self.matches else None
+
+class FAQIndex:
+    """Інвертований індекс слів FAQ: оцінюються лише питання-кандидати"""
+
+    # preprocess_text відкидає слова коротші за 3 символи
+    MIN_WORD_LENGTH = 3
+
+    def __init__(self, faq: Dict[str, str], engine: str = "substring",
+                 max_edit_distance: int = FAQ_MAX_EDIT_DISTANCE,
+                 compiled: Optional[CompiledFAQ] = None):
+        # (mtime, розмір) файлу, з якого побудовано індекс (задає FAQStore)
+        self.signature: Optional[Tuple[int, int]] = None
+        self.faq: Mapping[str, str]
+        self.keys: Sequence[str]
+        # слово -> номери питань FAQ, у яких воно зустрічається
+        self.postings: Mapping[str, Sequence[int]]
+        # програма -> номери питань про неї (для запитів "Программа: проблема")
+        self.partitions: Mapping[str, Sequence[int]]
+        # підрядок -> слова словника, які його містять
+        self.substrings: Mapping[str, Sequence[str]]
+        # Словник для виправлення опечаток: слово -> кількість питань з ним
+        self.spelling: Optional[SpellingIndex] = None
+        self.ranker: Optional[TfidfRanker] = None
+
+        if engine == "tfidf" and not numpy_available():
+            logging.warning("FAQ_ENGINE=tfidf requires NumPy, falling back to substring matching")
+            engine = "substring"
+        self.engine = engine
+        if compiled is not None:
+            self._open(compiled, max_edit_distance)
+        else:
+            self._build(faq, max_edit_distance)
+
+    def _build(self, faq: Dict[str, str], max_edit_distance: int) -> None:
+        """Нормалізує питання FAQ та будує всі таблиці в пам'яті"""
+        # Питання, що після нормалізації збігаються і мають ту саму відповідь,
+        # індексуються один раз; однакові відповіді зберігаються одним об'єктом
+        unique: Dict[str, str] = {}
+        self.documents: List[List[str]] = []
+        answers: Dict[str, str] = {}
+        seen: Set[Tuple[Tuple[str, ...], str]] = set()
+        for key, answer in faq.items():
+            words = preprocess_text(key)
+            answer = answers.setdefault(answer, answer)
+            if (tuple(words), answer) in seen:
+                continue
+            seen.add((tuple(words), answer))
+            unique[key] = answer
+            self.documents.append(words)
+        self.faq = unique
+        self.duplicates = len(faq) - len(unique)
+        self.keys = list(unique)
+        self.generation = faq_version(self.keys)
+
+        postings: Dict[str, List[int]] = {}
+        partitions: Dict[str, List[int]] = {}
+        for entry_id, words in enumerate(self.documents):
+            for word in dict.fromkeys(words):
+                postings.setdefault(word, []).append(entry_id)
+            for program in programs_in(words):
+                partitions.setdefault(program, []).append(entry_id)
+        substrings: Dict[str, List[str]] = {}
+        for word in postings:
+            for part in _substrings(word, self.MIN_WORD_LENGTH):
+                substrings.setdefault(part, []).append(word)
+        self.postings, self.partitions, self.substrings = postings, partitions, substrings
+
+        if max_edit_distance > 0:
+            self.spelling = SpellingIndex(
+                {word: len(entries) for word, entries in postings.items()},
+                max_edit_distance
+            )
+        if self.engine == "tfidf":
+            self.ranker = TfidfRanker(self, self.documents)
+
+    def _open(self, compiled: CompiledFAQ, max_edit_distance: int) -> None:
+        """Бере таблиці зі скомпільованого індексу: вони читаються з mmap при зверненні"""
+        self.faq = compiled.answers()
+        self.keys = compiled.keys()
+        self.generation = compiled.generation
+        self.duplicates = compiled.duplicates
+        self.postings = compiled.postings()
+        self.partitions = compiled.partitions()
+        self.substrings = compiled.substrings()
+
+        if max_edit_distance > 0:
+            if compiled.spelling_distance == max_edit_distance:
+                self.spelling = SpellingIndex(compiled.frequencies(), max_edit_distance, compiled.deletes())
+            else:
+                # Індекс скомпільовано з іншим FAQ_MAX_EDIT_DISTANCE - словник будуємо в пам'яті
+                self.spelling = SpellingIndex(dict(compiled.frequencies()), max_edit_distance)
+        if self.engine == "tfidf":
+            arrays = compiled.tfidf_arrays()
+            if arrays is not None:
+                self.ranker = TfidfRanker(self, arrays=arrays, term_ids=compiled.term_ids())
+            else:
+                self.ranker = TfidfRanker(self, compiled.documents())
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def related_words(self, query_word: str) -> Set[str]:
+        """Слова словника, що містять query_word або містяться в ньому"""
+        # query_word є частиною слова з FAQ
+        words = set(self.substrings.get(query_word, ()))
+        # слово з FAQ є частиною query_word
+        for part in _substrings(query_word, self.MIN_WORD_LENGTH):
+            if part in self.postings:
+                words.add(part)
+        return words
+
+    def candidates(self, query_word: str) -> Set[int]:
+        """Номери питань, у яких є слово, пов'язане з query_word"""
+        entries: Set[int] = set()
+        for word in self.related_words(query_word):
+            entries.update(self.postings[word])
+        return entries
+
+    def correct_words(self, query_words: List[str]) -> List[str]:
+        """Виправляє опечатки в словах, яких немає в словнику FAQ"""
+        if self.spelling is None:
+            return query_words
+        # Частковий збіг не привід не виправляти: "открываеться" містить "открывает"
+        # з іншого питання, а потрібне "открывается"
+        return [word if word in self.postings else self.spelling.correct(word) or word
+                for word in query_words]
+
+    def search(self, question: str, k: int = FAQ_SUGGESTIONS) -> MatchResult:
+        """До k найкращих співпадінь з оцінками від 0 до 1"""
+        # Найкраще співпадіння потрібне завжди, навіть якщо підказки вимкнено (k=0)
+        k = max(1, k)
+        query_words = preprocess_text(question)
+        if not query_words:
+            return MatchResult(self.generation, [], self.faq)
+        matches = self.match_query(question, query_words, k)
+        corrected = self.correct_words(query_words)
+        if corrected != query_words:
+            # Виправлення лишаємо, лише якщо з ним знайдено краще співпадіння
+            corrected_matches = self.match_query(question, corrected, k)
+            if corrected_matches and (not matches or corrected_matches[0][1] > matches[0][1]):
+                matches = corrected_matches
+        return MatchResult(
+            self.generation,
+            [(entry_id, self.keys[entry_id], score) for entry_id, score in matches],
+            self.faq
+        )
+
+    def match_query(self, question: str, query_words: List[str], k: int) -> List[Tuple[int, float]]:
+        """До k найкращих (номер питання, оцінка) для слів запиту question"""
+        # Якщо програму вказано, шукаємо спершу серед питань про неї. Назва програми
+        # є в кожному питанні розділу, тож оцінюються лише слова проблеми
+        matches: List[Tuple[int, float]] = []
+        program, _ = split_program(question)
+        if program in self.partitions:
+            problem_words = [word for word in query_words if PROGRAM_WORDS.get(word) != program]
+            if problem_words:
+                matches = self.match_words(problem_words, k, self.partitions[program])
+        if not matches or matches[0][1] <= FAQ_THRESHOLD:
+            # У розділі програми впевненої відповіді немає - беремо кращий із глобальним пошуком
+            global_matches = self.match_words(query_words, k)
+            if not matches or (global_matches and global_matches[0][1] > matches[0][1]):
+                matches = global_matches
+        return matches
+
+    def best_match(self, question: str) -> Tuple[Optional[str], float]:
+        """Найкраще співпадіння та його оцінка від 0 до 1"""
+        result = self.search(question, 1)
+        return result.key, result.score
+
+    def match_words(self, query_words: List[str], k: int,
+                    entries: Optional[List[int]] = None) -> List[Tuple[int, float]]:
+        """До k найкращих (номер питання, оцінка) серед питань entries (None - серед усіх)"""
+        if self.ranker is not None:
+            return self.ranker.top_matches(query_words, k, entries)
+        return self.substring_matches(query_words, k, entries)
+
+    def substring_matches(self, query_words: List[str], k: int,
+                          entries: Optional[List[int]] = None) -> List[Tuple[int, float]]:
+        """Найкращі співпадіння за підрядками; оцінки ідентичні calculate_similarity"""
+        allowed = set(entries) if entries is not None else None
+        matches: Dict[int, int] = {}
+        for word, occurrences in Counter(query_words).items():
+            for entry_id in self.candidates(word):
+                if allowed is None or entry_id in allowed:
+                    matches[entry_id] = matches.get(entry_id, 0) + occurrences
+
+        # При однаковій оцінці перемагає питання, що йде першим у файлі
+        best_ids = heapq.nsmallest(k, matches, key=lambda entry_id: (-matches[entry_id], entry_id))
+        return [(entry_id, matches[entry_id] / len(query_words)) for entry_id in best_ids]
+
+class FAQStore:
+    """Кеш FAQ у пам'яті з гарячим перезавантаженням за mtime/розміром файлу"""
+
+    def __init__(self, path: Path, check_interval: float = FAQ_RELOAD_INTERVAL, engine: str = FAQ_ENGINE,
+                 index_path: Optional[Path] = FAQ_INDEX_PATH):
+        self.path = path
+        # Скомпільований індекс (scripts/compile_faq_index.py), якщо він актуальний
+        self.index_path = index_path
+        self.check_interval = check_interval
+        self.engine = engine
+        self._index = FAQIndex({})
+        self._signature: Optional[Tuple[int, int]] = None
+        self._loaded = False
+        self.compiled = False
+        self._lock = threading.Lock()
+        # Лічильники та мітки часу для моніторингу
+        self.reload_count = 0
+        self.reload_errors = 0
+        self.last_load_time: Optional[float] = None
+        self.last_check_time: Optional[float] = None
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        """Повертає (mtime, розмір) файлу або None, якщо файлу немає"""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self) -> Mapping[str, str]:
+        """Повертає поточний знімок FAQ (читає диск лише при першому зверненні)"""
+        return self.index.faq
+
+    @property
+    def index(self) -> FAQIndex:
+        """Поточний індекс FAQ (разом із самим FAQ він замінюється атомарно)"""
+        if not self._loaded:
+            self.refresh()
+        return self._index
+
+    def refresh(self, force: bool = False) -> bool:
+        """Перезавантажує FAQ, якщо файл змінився. Повертає True при перезавантаженні"""
+        with self._lock:
+            self.last_check_time = time.time()
+            signature = self._file_signature()
+            if self._loaded and not force and signature == self._signature:
+                return False
+            try:
+                index = self._load_index(signature)
+            except Exception as e:
+                # Файл може бути записаний наполовину - лишаємо попередню версію
+                self.reload_errors += 1
+                logging.error(f"Ошибка загрузки FAQ: {e}")
+                # Якщо не вдалося вже перше завантаження, працюємо з порожнім FAQ: інакше
+                # кожне звернення до index з обробника читало б файл у циклі подій.
+                # Повторні спроби робить watch() поза циклом подій
+                self._loaded = True
+                return False
+            # Атомарна заміна посилання: читачі бачать або стару, або нову версію
+            index.signature = signature
+            self._index = index
+            self._signature = signature
+            self._loaded = True
+            self.reload_count += 1
+            self.last_load_time = time.time()
+            logging.info(
+                f"FAQ loaded: {len(index)} entries, {index.duplicates} duplicates merged "
+                f"(reload #{self.reload_count}{', compiled index' if self.compiled else ''})"
+            )
+            return True
+
+    def _load_index(self, signature: Optional[Tuple[int, int]]) -> FAQIndex:
+        """Будує індекс зі скомпільованого файлу, якщо він актуальний, інакше з JSON"""
+        compiled = None
+        if self.index_path is not None:
+            try:
+                compiled = load_compiled_index(self.index_path, signature)
+            except Exception as e:
+                logging.warning(f"Compiled FAQ index is unusable, loading JSON: {e}")
+            if compiled is None and self.index_path.exists():
+                logging.info("Compiled FAQ index is out of date, loading JSON")
+        self.compiled = compiled is not None
+        if compiled is not None:
+            return FAQIndex({}, self.engine, compiled=compiled)
+        return FAQIndex(_read_faq(self.path), self.engine)
+
+    async def watch(self, interval: Optional[float] = None) -> None:
+        """Фонова задача: періодично перевіряє файл FAQ поза циклом подій"""
+        loop = asyncio.get_running_loop()
+        interval = interval or self.check_interval
+        while True:
+            try:
+                await loop.run_in_executor(None, self.refresh)
+            except Exception as e:
+                logging.error(f"Error in FAQStore.watch: {e}")
+            await asyncio.sleep(interval)
+
+    def stats(self) -> Dict[str, object]:
+        """Повертає лічильники перезавантажень та мітки часу"""
+        return {
+            "engine": self._index.engine,
+            "entries": len(self._index),
+            "duplicates": self._index.duplicates,
+            "compiled": self.compiled,
+            "vocabulary": len(self._index.postings),
+            "reload_count": self.reload_count,
+            "reload_errors": self.reload_errors,
+            "last_load_time": self.last_load_time,
+            "last_check_time": self.last_check_time,
+        }
+
+class QueryCache:
+    """
+    LRU-кеш результатів пошуку з обмеженим часом життя. Ключ - нормалізований
+    текст запиту; при перезавантаженні FAQ (новий індекс) кеш очищається.
+    """
+
+    def __init__(self, max_size: int = FAQ_CACHE_SIZE, ttl: float = FAQ_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        # ключ -> (час запису, результат)
+        self._entries: "OrderedDict[Tuple[int, Optional[str], str], Tuple[float, MatchResult]]" = OrderedDict()
+        # Індекс, для якого зібрано результати
+        self._index: Optional[FAQIndex] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> Optional[float]:
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def key_for(self, question: str, k: int) -> Tuple[int, Optional[str], str]:
+        # Програма входить у ключ: "Telegram: не работает" шукається інакше, ніж "telegram не работает"
+        program, _ = split_program(question)
+        return k, program, normalize_text(question)
+
+    def lookup(self, index: FAQIndex, key: Tuple[int, Optional[str], str]) -> Optional[MatchResult]:
+        """Результат з кешу або None (рахує влучання та промахи)"""
+        now = time.monotonic()
+        with self._lock:
+            if self._index is not index:
+                # FAQ перезавантажено - старі результати недійсні
+                self._entries.clear()
+                self._index = index
+            cached = self._entries.get(key)
+            if cached is not None and now - cached[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+            return None
+
+    def store(self, index: FAQIndex, key: Tuple[int, Optional[str], str], result: MatchResult) -> None:
+        with self._lock:
+            # Пошук, що завершився вже після перезавантаження FAQ, не кешуємо
+            if self._index is index:
+                self._entries[key] = (time.monotonic(), result)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+    def search(self, index: FAQIndex, question: str, k: int) -> MatchResult:
+        """Результат index.search(question, k) з кешу або з індексу"""
+        if self.max_size <= 0:
+            return index.search(question, k)
+        key = self.key_for(question, k)
+        result = self.lookup(index, key)
+        if result is None:
+            result = index.search(question, k)
+            self.store(index, key, result)
+        return result
+
+# Спільний для всього процесу кеш FAQ
+faq_store = FAQStore(FAQ_PATH)
+
+# Спільний кеш результатів пошуку
+query_cache = QueryCache()
+
+def find_best_match(question: str, faq: Optional[Dict[str, str]] = None) -> Tuple[Optional[str], float]:
     """Знаходить найкраще співпадіння в FAQ"""
-    query_words = preprocess_text(question)
-    best_score = 0.0
-    best_key = None
-    
-    for faq_question in faq.keys():
-        faq_words = preprocess_text(faq_question)
-        similarity = calculate_similarity(query_words, faq_words)
-        
-        if similarity > best_score:
-            best_score = similarity
-            best_key = faq_question
-    
-    return best_key, best_score
+    if faq is None or faq is faq_store.get():
+        index = faq_store.index
+    else:
+        index = FAQIndex(faq, faq_store.engine)
+    return index.best_match(question)
+
+def search_faq(question: str, k: int = FAQ_SUGGESTIONS) -> MatchResult:
+    """До k найкращих питань FAQ для запиту"""
+    index = faq_store.index
+    if not question:
+        return MatchResult(index.generation, [], index.faq)
+    return query_cache.search(index, question, k)
+
+def get_answer(generation: str, entry_id: int) -> Optional[str]:
+    """Відповідь на питання з номером entry_id, якщо список питань FAQ відтоді не змінився"""
+    index = faq_store.index
+    if index.generation != generation or not 0 <= entry_id < len(index):
+        return None
+    return index.faq[index.keys[entry_id]]
 
 def find_answer(question: str) -> Optional[str]:
     """Пошук відповіді на питання в базі FAQ."""
     if not question:
         return None
     
-    faq = load_faq()
-    best_match, score = find_best_match(question, faq)
+    result = search_faq(question)
     
-    # Якщо схожість більше 0.5 (50%), повертаємо відповідь
-    if best_match and score > 0.5:
-        return faq[best_match]
+    # Якщо схожість більше порогу (за замовчуванням 0.5), повертаємо відповідь
+    if result.key and result.score > FAQ_THRESHOLD:
+        return result.answer
     
     return None
 
-def get_next_ticket_number() -> int:
-    """Повертає наступний номер звернення"""
-    try:
-        # Читаємо поточний номер з файлу
-        current_number = 1
-        if TICKET_FILE.exists():
-            current_number = int(TICKET_FILE.read_text().strip() or '0') + 1
-        
-        # Зберігаємо новий номер
-        TICKET_FILE.write_text(str(current_number))
-        
-        return current_number
-    except Exception as e:
-        logging.error(f"Error in get_next_ticket_number: {e}")
-        return 1  # Повертаємо 1 у випадку помилки 
\ No newline at end of file
+# Пул для пошуку в FAQ поза циклом подій (створюється при першому використанні)
+_faq_executor: Optional[Executor] = None
+
+def _get_faq_executor() -> Executor:
+    global _faq_executor
+    if _faq_executor is None:
+        if FAQ_OFFLOAD_EXECUTOR == "process":
+            # spawn, а не fork: у процесі бота вже працюють потоки (логування, SQLite,
+            # перевірка FAQ), і дочірній процес успадкував би захоплені ними блокування
+            _faq_executor = ProcessPoolExecutor(
+                max_workers=FAQ_OFFLOAD_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker
+            )
+        else:
+            _faq_executor = ThreadPoolExecutor(max_workers=FAQ_OFFLOAD_WORKERS, thread_name_prefix="faq")
+    return _faq_executor
+
+def _init_worker() -> None:
+    """
+    Завантажує FAQ у щойно запущеному процесі пулу (до першого запиту). Актуальний
+    скомпільований індекс відкривається через mmap, тож його сторінки спільні з
+    іншими процесами; інакше процес будує з JSON власну копію індексу
+    """
+    faq_store.refresh()
+
+def _search_in_worker(question: str, k: int) -> Tuple[Optional[Tuple[int, int]], List[Tuple[int, str, float]]]:
+    """Пошук у процесі пулу: (версія файлу FAQ, знайдені питання)"""
+    # Процес має власне сховище FAQ; перевіряємо, чи файл не змінився
+    faq_store.refresh()
+    index = faq_store.index
+    return index.signature, index.search(question, k).matches
+
+async def search_faq_async(question: str, k: int = FAQ_SUGGESTIONS) -> MatchResult:
+    """
+    Те саме, що search_faq, але великі FAQ (від FAQ_OFFLOAD_THRESHOLD питань)
+    оцінюються в пулі потоків або процесів, не блокуючи цикл подій.
+    """
+    index = faq_store.index
+    if not question or len(index) < FAQ_OFFLOAD_THRESHOLD:
+        return search_faq(question, k)
+
+    key = query_cache.key_for(question, k)
+    if query_cache.max_size > 0:
+        cached = query_cache.lookup(index, key)
+        if cached is not None:
+            return cached
+
+    loop = asyncio.get_running_loop()
+    executor = _get_faq_executor()
+    if isinstance(executor, ProcessPoolExecutor):
+        signature, matches = await loop.run_in_executor(executor, _search_in_worker, question, k)
+        if signature == index.signature:
+            result = MatchResult(index.generation, matches, index.faq)
+        else:
+            # Процес пулу бачив іншу версію файлу - номери питань можуть не збігатися
+            result = await loop.run_in_executor(None, index.search, question, k)
+    else:
+        result = await loop.run_in_executor(executor, index.search, question, k)
+
+    if query_cache.max_size > 0:
+        query_cache.store(index, key, result)
+    return result
+
+def shutdown_faq_executor() -> None:
+    """Зупиняє пул пошуку в FAQ (при завершенні бота)"""
+    global _faq_executor
+    if _faq_executor is not None:
+        _faq_executor.shutdown(wait=False)
+        _faq_executor = None
@@ -6,7 +6,7 @@ import logging
 from pathlib import Path
 from aiogram import types
 from aiogram.filters.command import Command
-from aiogram.types import FSInputFile, InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
@@ -25,9 +25,19 @@ from .keyboards import (
     get_request_keyboard,
     get_download_button,
     get_other_programs_keyboard,
-    get_rating_keyboard
+    get_rating_keyboard,
+    get_yaware_info_keyboard,
+    get_anydesk_keyboard,
+    get_faq_suggestions_keyboard
 )
-from .faq import find_answer, get_next_ticket_number
+from .config import FAQ_THRESHOLD, FAQ_SUGGESTIONS, FAQ_SUGGESTION_THRESHOLD
+from .faq import search_faq_async, get_answer
+from .tickets import next_ticket_number
+from .media import media_registry
+from .ratings import ratings_writer
+from .misses import miss_log
+from .metrics import bot_metrics
+from .outbound import outbound_priority, PRIORITY_LOW
 
 # Шляхи до зображень
 IMAGES_DIR = Path(__file__).parent.parent / "images"
@@ -48,11 +58,10 @@ async def cmd_start(message: types.Message, state: FSMContext):
     await state.clear()
     
     try:
-        # Створюємо об'єкт FSInputFile для локального файлу
-        welcome_image = FSInputFile(WELCOME_IMAGE_PATH)
-        # Надсилаємо привітання з зображенням
-        await message.answer_photo(
-            welcome_image,
+        # Надсилаємо привітання з зображенням (повторно - за збереженим file_id)
+        await media_registry.answer_photo(
+            message,
+            WELCOME_IMAGE_PATH,
             caption=TEXTS["welcome"],
             reply_markup=get_main_keyboard(),
             parse_mode="Markdown"
@@ -87,29 +96,12 @@ async def handle_main_menu(message: types.Message, state: FSMContext):
             parse_mode="Markdown"
         )
         
-        # Створюємо інлайн кнопки для додаткової інформації
-        info_keyboard = InlineKeyboardMarkup(
-            inline_keyboard=[
-                [
-                    InlineKeyboardButton(
-                        text="Что такое Yaware?",
-                        url="https://yaware.com.ua/uk/what-is-yaware/"
-                    )
-                ],
-                [
-                    InlineKeyboardButton(
-                        text="Yaware - программа шпион?",
-                        url="https://yaware.com.ua/uk/blog/tajm-treker-ne-shpigunske-programne-zabezpechennya-u-chomu-rizniczya/"
-                    )
-                ]
-            ]
-        )
-        
-        # Відправляємо кнопки для додаткової інформації
-        await message.answer(
-            "👇 Дополнительная информация:",
-            reply_markup=info_keyboard
-        )
+        # Відправляємо кнопки для додаткової інформації (другорядне повідомлення)
+        with outbound_priority(PRIORITY_LOW):
+            await message.answer(
+                "👇 Дополнительная информация:",
+                reply_markup=get_yaware_info_keyboard()
+            )
         
         # Відправляємо фінальне повідомлення з вибором версії
         await message.answer(
@@ -185,18 +177,36 @@ async def handle_help_request(message: types.Message, state: FSMContext):
         await state.update_data(user_message=message.text)
             
         # Шукаємо відповідь в FAQ
-        answer = find_answer(message.text)
-        if answer:
+        result = await search_faq_async(message.text, max(1, FAQ_SUGGESTIONS))
+        suggestions = [
+            match for match in result.matches if match[2] >= FAQ_SUGGESTION_THRESHOLD
+        ][:FAQ_SUGGESTIONS]
+        if result.key and result.score > FAQ_THRESHOLD:
+            bot_metrics.faq_hits += 1
             await message.answer(
-                answer,
+                result.answer,
                 reply_markup=get_help_keyboard(),
                 parse_mode="Markdown"
             )
+        elif suggestions:
+            bot_metrics.faq_suggestions += 1
+            miss_log.record(message.text, result, len(suggestions))
+            # Точної відповіді немає - пропонуємо схожі питання замість звернення до адміна
+            await message.answer(
+                "🤔 Точного ответа я не нашел. Возможно, ты имел в виду:",
+                reply_markup=get_faq_suggestions_keyboard(result.generation, suggestions)
+            )
+            await message.answer(
+                "Если ничего не подходит, можно обратиться к администраторам:",
+                reply_markup=get_help_keyboard()
+            )
         else:
+            bot_metrics.faq_misses += 1
+            miss_log.record(message.text, result)
             # Відправляємо сумного робота і повідомлення про відсутність рішення
-            sad_robot = FSInputFile(SAD_ROBOT_PATH)
-            await message.answer_photo(
-                sad_robot,
+            await media_registry.answer_photo(
+                message,
+                SAD_ROBOT_PATH,
                 caption=TEXTS["no_solution"],
                 parse_mode="Markdown"
             )
@@ -225,18 +235,18 @@ async def handle_admin_request(message: types.Message, state: FSMContext):
                 ]
             )
             
-            # Створюємо об'єкт FSInputFile для зображення
-            admin_image = FSInputFile(ADMIN_IMAGE_PATH)
-            
             # Відправляємо зображення з текстом адміністраторам
-            await message.bot.send_photo(
+            await media_registry.send_photo(
+                message.bot,
                 TRACKER_ADMIN_CHAT_ID,
-                admin_image,
+                ADMIN_IMAGE_PATH,
                 caption=TEXTS["admin_install_request"].format(username=username),
                 reply_markup=reply_markup,
                 parse_mode="Markdown"
             )
             
+            bot_metrics.admin_escalations += 1
+
             # Повідомляємо користувача про успіх
             await message.answer(
                 TEXTS["request_sent"],
@@ -272,6 +282,8 @@ async def handle_admin_request(message: types.Message, state: FSMContext):
         user_id = message.from_user.id
         
         try:
+            ticket_number = await next_ticket_number()
+
             # Створюємо клавіатуру з кнопкою відповіді
             reply_markup = InlineKeyboardMarkup(
                 inline_keyboard=[
@@ -282,15 +294,14 @@ async def handle_admin_request(message: types.Message, state: FSMContext):
                 ]
             )
             
-            # Створюємо об'єкт FSInputFile для зображення
-            admin_image = FSInputFile(ADMIN_IMAGE_PATH)
-            
-            # Відправляємо зображення з текстом адміністраторам
-            await message.bot.send_photo(
+            # Спершу запит адміністраторам: рекомендацію користувач отримує, лише
+            # якщо запит дійшов (інакше після неї прийшло б повідомлення про помилку)
+            await media_registry.send_photo(
+                message.bot,
                 ADMIN_CHAT_ID,
-                admin_image,
+                ADMIN_IMAGE_PATH,
                 caption=TEXTS["admin_help_request"].format(
-                    ticket_number=get_next_ticket_number(),
+                    ticket_number=ticket_number,
                     username=username,
                     user_message=user_message
                 ),
@@ -298,22 +309,16 @@ async def handle_admin_request(message: types.Message, state: FSMContext):
                 parse_mode="Markdown"
             )
             
-            # Відправляємо рекомендацію щодо AnyDesk
-            anydesk_keyboard = InlineKeyboardMarkup(
-                inline_keyboard=[
-                    [InlineKeyboardButton(
-                        text="📥 Установить AnyDesk",
-                        url=DOWNLOAD_URLS["anydesk"]
-                    )]
-                ]
-            )
-            
-            await message.answer(
-                TEXTS["anydesk_recommendation"],
-                reply_markup=anydesk_keyboard,
-                parse_mode="Markdown"
-            )
-            
+            bot_metrics.admin_escalations += 1
+
+            # Рекомендація щодо AnyDesk (другорядне повідомлення)
+            with outbound_priority(PRIORITY_LOW):
+                await message.answer(
+                    TEXTS["anydesk_recommendation"],
+                    reply_markup=get_anydesk_keyboard(),
+                    parse_mode="Markdown"
+                )
+
             # Повідомляємо користувача про успіх
             await message.answer(
                 TEXTS["request_sent"],
@@ -403,6 +408,33 @@ async def handle_admin_reply(callback: types.CallbackQuery):
         logging.error(f"Error in handle_admin_reply: {e}")
         await callback.answer("Помилка при створенні посилання на чат")
 
+# Додаємо обробник для кнопок зі схожими питаннями FAQ
+async def handle_faq_choice(callback: types.CallbackQuery):
+    """Обробка вибору питання зі списку схожих"""
+    try:
+        # callback_data: faq_<версія FAQ>_<номер питання>
+        _, generation, entry_id = callback.data.split('_')
+        answer = get_answer(generation, int(entry_id))
+        if answer is None:
+            # Список питань FAQ змінився після показу кнопок - номери питань могли зсунутися
+            await callback.answer("Список вопросов обновился, опиши проблему еще раз", show_alert=True)
+            return
+
+        bot_metrics.faq_suggestions_chosen += 1
+        await callback.message.answer(
+            answer,
+            reply_markup=get_help_keyboard(),
+            parse_mode="Markdown"
+        )
+        
+        # Видаляємо кнопки зі схожими питаннями
+        await callback.message.edit_reply_markup(reply_markup=None)
+        await callback.answer()
+        
+    except Exception as e:
+        logging.error(f"Error in handle_faq_choice: {e}")
+        await callback.answer("Помилка при отриманні відповіді")
+
 # Додаємо обробник для кнопок оцінки
 async def handle_rating(callback: types.CallbackQuery):
     """Обробка оцінки від користувача"""
@@ -410,6 +442,11 @@ async def handle_rating(callback: types.CallbackQuery):
         # Отримуємо оцінку з callback_data
         rating = int(callback.data.split('_')[1])
         
+        # Зберігаємо оцінку одразу (запис на диск виконується у фоні пакетами),
+        # щоб помилка відправлення подяки чи зміни кнопок не загубила голос
+        ratings_writer.record(callback.from_user.id, str(rating))
+        logging.info(f"User {callback.from_user.id} rated the bot with {rating} stars")
+        
         # Дякуємо за оцінку
         await callback.message.answer(
             TEXTS["rating_thanks"],
@@ -423,9 +460,6 @@ async def handle_rating(callback: types.CallbackQuery):
         # Відповідаємо на callback
         await callback.answer()
         
-        # Тут можна додати логіку збереження оцінки в базу даних
-        logging.info(f"User {callback.from_user.id} rated the bot with {rating} stars")
-        
     except Exception as e:
         logging.error(f"Error in handle_rating: {e}")
         await callback.answer("Помилка при обробці оцінки") 
\ No newline at end of file
@@ -1,12 +1,21 @@
 """
 Модуль з функціями для створення клавіатур.
+
+Статичні клавіатури створюються один раз при імпорті, а функції get_*
+повертають ті самі екземпляри (get_download_button - з lru_cache). Розмітки
+aiogram 3.3 змінювані (ReplyKeyboardMarkup та InlineKeyboardMarkup не frozen),
+тому повернені об'єкти не можна змінювати: зміна зачепить усіх користувачів.
+Для іншої клавіатури будуйте новий об'єкт.
 """
 
+from functools import lru_cache
+from typing import List, Tuple
+
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import ReplyKeyboardBuilder
-from .texts import TEXTS
+from .texts import TEXTS, DOWNLOAD_URLS
 
-def get_main_keyboard() -> ReplyKeyboardMarkup:
+def _build_main_keyboard() -> ReplyKeyboardMarkup:
     """Створює головну клавіатуру"""
     builder = ReplyKeyboardBuilder()
     
@@ -19,7 +28,7 @@ def get_main_keyboard() -> ReplyKeyboardMarkup:
     
     return builder.as_markup(resize_keyboard=True)
 
-def get_yaware_keyboard() -> ReplyKeyboardMarkup:
+def _build_yaware_keyboard() -> ReplyKeyboardMarkup:
     """Створює клавіатуру для встановлення YaWare"""
     builder = ReplyKeyboardBuilder()
     
@@ -36,7 +45,7 @@ def get_yaware_keyboard() -> ReplyKeyboardMarkup:
     
     return builder.as_markup(resize_keyboard=True)
 
-def get_help_keyboard() -> ReplyKeyboardMarkup:
+def _build_help_keyboard() -> ReplyKeyboardMarkup:
     """Створює клавіатуру для меню допомоги"""
     builder = ReplyKeyboardBuilder()
     
@@ -48,13 +57,13 @@ def get_help_keyboard() -> ReplyKeyboardMarkup:
     
     return builder.as_markup(resize_keyboard=True)
 
-def get_back_keyboard() -> ReplyKeyboardMarkup:
+def _build_back_keyboard() -> ReplyKeyboardMarkup:
     """Створює клавіатуру з кнопкою 'Назад'"""
     builder = ReplyKeyboardBuilder()
     builder.row(KeyboardButton(text="⬅️ Назад"))
     return builder.as_markup(resize_keyboard=True)
 
-def get_request_keyboard() -> ReplyKeyboardMarkup:
+def _build_request_keyboard() -> ReplyKeyboardMarkup:
     """Створює клавіатуру для надсилання запиту"""
     builder = ReplyKeyboardBuilder()
     builder.row(
@@ -65,8 +74,9 @@ def get_request_keyboard() -> ReplyKeyboardMarkup:
         )
     return builder.as_markup(resize_keyboard=True)
 
+@lru_cache(maxsize=64)
 def get_download_button(url: str) -> InlineKeyboardMarkup:
-    """Створює кнопку для завантаження"""
+    """Створює кнопку для завантаження (кешується за URL; спільний об'єкт не змінювати)"""
     keyboard = InlineKeyboardMarkup(
         inline_keyboard=[
             [InlineKeyboardButton(text="📥 Скачать", url=url)]
@@ -74,7 +84,7 @@ def get_download_button(url: str) -> InlineKeyboardMarkup:
     )
     return keyboard
 
-def get_instruction_keyboard() -> ReplyKeyboardMarkup:
+def _build_instruction_keyboard() -> ReplyKeyboardMarkup:
     """Створює клавіатуру для підтвердження встановлення"""
     builder = ReplyKeyboardBuilder()
     
@@ -86,13 +96,13 @@ def get_instruction_keyboard() -> ReplyKeyboardMarkup:
     
     return builder.as_markup(resize_keyboard=True)
 
-def get_final_keyboard() -> ReplyKeyboardMarkup:
+def _build_final_keyboard() -> ReplyKeyboardMarkup:
     """Створює фінальну клавіатуру"""
     builder = ReplyKeyboardBuilder()
     builder.row(KeyboardButton(text="🔄 Начать сначала"))
     return builder.as_markup(resize_keyboard=True)
 
-def get_rating_keyboard() -> InlineKeyboardMarkup:
+def _build_rating_keyboard() -> InlineKeyboardMarkup:
     """Створює клавіатуру для оцінки"""
     keyboard = InlineKeyboardMarkup(
         inline_keyboard=[
@@ -105,7 +115,7 @@ def get_rating_keyboard() -> InlineKeyboardMarkup:
     )
     return keyboard
 
-def get_other_programs_keyboard() -> ReplyKeyboardMarkup:
+def _build_other_programs_keyboard() -> ReplyKeyboardMarkup:
     """Створює клавіатуру для меню інших програм"""
     builder = ReplyKeyboardBuilder()
     
@@ -124,4 +134,106 @@ def get_other_programs_keyboard() -> ReplyKeyboardMarkup:
         KeyboardButton(text="❓ Нужна помощь админа")
     )
     
-    return builder.as_markup(resize_keyboard=True) 
\ No newline at end of file
+    return builder.as_markup(resize_keyboard=True)
+
+def _build_yaware_info_keyboard() -> InlineKeyboardMarkup:
+    """Створює кнопки з додатковою інформацією про YaWare"""
+    keyboard = InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                InlineKeyboardButton(
+                    text="Что такое Yaware?",
+                    url="https://yaware.com.ua/uk/what-is-yaware/"
+                )
+            ],
+            [
+                InlineKeyboardButton(
+                    text="Yaware - программа шпион?",
+                    url="https://yaware.com.ua/uk/blog/tajm-treker-ne-shpigunske-programne-zabezpechennya-u-chomu-rizniczya/"
+                )
+            ]
+        ]
+    )
+    return keyboard
+
+def _build_anydesk_keyboard() -> InlineKeyboardMarkup:
+    """Створює кнопку встановлення AnyDesk"""
+    keyboard = InlineKeyboardMarkup(
+        inline_keyboard=[
+            [InlineKeyboardButton(
+                text="📥 Установить AnyDesk",
+                url=DOWNLOAD_URLS["anydesk"]
+            )]
+        ]
+    )
+    return keyboard
+
+def get_faq_suggestions_keyboard(generation: str, suggestions: List[Tuple[int, str, float]]) -> InlineKeyboardMarkup:
+    """Створює кнопки з питаннями FAQ, схожими на запит користувача"""
+    keyboard = InlineKeyboardMarkup(
+        inline_keyboard=[
+            [InlineKeyboardButton(
+                text=f"❔ {question[:1].upper()}{question[1:]}",
+                callback_data=f"faq_{generation}_{entry_id}"
+            )]
+            for entry_id, question, _ in suggestions
+        ]
+    )
+    return keyboard
+
+# Готові екземпляри статичних клавіатур
+MAIN_KEYBOARD = _build_main_keyboard()
+YAWARE_KEYBOARD = _build_yaware_keyboard()
+HELP_KEYBOARD = _build_help_keyboard()
+BACK_KEYBOARD = _build_back_keyboard()
+REQUEST_KEYBOARD = _build_request_keyboard()
+INSTRUCTION_KEYBOARD = _build_instruction_keyboard()
+FINAL_KEYBOARD = _build_final_keyboard()
+RATING_KEYBOARD = _build_rating_keyboard()
+OTHER_PROGRAMS_KEYBOARD = _build_other_programs_keyboard()
+YAWARE_INFO_KEYBOARD = _build_yaware_info_keyboard()
+ANYDESK_KEYBOARD = _build_anydesk_keyboard()
+
+def get_main_keyboard() -> ReplyKeyboardMarkup:
+    """Повертає головну клавіатуру"""
+    return MAIN_KEYBOARD
+
+def get_yaware_keyboard() -> ReplyKeyboardMarkup:
+    """Повертає клавіатуру для встановлення YaWare"""
+    return YAWARE_KEYBOARD
+
+def get_help_keyboard() -> ReplyKeyboardMarkup:
+    """Повертає клавіатуру для меню допомоги"""
+    return HELP_KEYBOARD
+
+def get_back_keyboard() -> ReplyKeyboardMarkup:
+    """Повертає клавіатуру з кнопкою 'Назад'"""
+    return BACK_KEYBOARD
+
+def get_request_keyboard() -> ReplyKeyboardMarkup:
+    """Повертає клавіатуру для надсилання запиту"""
+    return REQUEST_KEYBOARD
+
+def get_instruction_keyboard() -> ReplyKeyboardMarkup:
+    """Повертає клавіатуру для підтвердження встановлення"""
+    return INSTRUCTION_KEYBOARD
+
+def get_final_keyboard() -> ReplyKeyboardMarkup:
+    """Повертає фінальну клавіатуру"""
+    return FINAL_KEYBOARD
+
+def get_rating_keyboard() -> InlineKeyboardMarkup:
+    """Повертає клавіатуру для оцінки"""
+    return RATING_KEYBOARD
+
+def get_other_programs_keyboard() -> ReplyKeyboardMarkup:
+    """Повертає клавіатуру для меню інших програм"""
+    return OTHER_PROGRAMS_KEYBOARD
+
+def get_yaware_info_keyboard() -> InlineKeyboardMarkup:
+    """Повертає кнопки з додатковою інформацією про YaWare"""
+    return YAWARE_INFO_KEYBOARD
+
+def get_anydesk_keyboard() -> InlineKeyboardMarkup:
+    """Повертає кнопку встановлення AnyDesk"""
+    return ANYDESK_KEYBOARD
@@ -0,0 +1,118 @@
+"""
+Модуль з налаштуванням неблокуючого логування.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+from .config import (
+    LOG_LEVEL,
+    LOG_FORMAT,
+    LOG_ROTATION,
+    LOG_MAX_BYTES,
+    LOG_BACKUP_COUNT,
+    LOG_ROTATE_WHEN
+)
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+class JsonLinesFormatter(logging.Formatter):
+    """Форматує запис логу як один JSON-рядок"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False)
+
+_traceback_formatter = logging.Formatter()
+
+class TracebackQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler, що не вклеює traceback у текст повідомлення. Стандартний prepare()
+    дописує його в msg і очищає exc_info, тож JSON-формат не бачив би traceback окремо.
+    Тут traceback зберігається в exc_text, а повідомлення лишається як є.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        # Аргументи підставляємо одразу: потік-слухач не повинен бачити змінені об'єкти
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _traceback_formatter.formatException(record.exc_info)
+        # Об'єкти traceback не тримаємо в черзі (вони утримують кадри стеку)
+        record.exc_info = None
+        return record
+
+def _file_handler(log_path: Path) -> logging.Handler:
+    """Файловий обробник з ротацією за розміром або за часом"""
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    if LOG_ROTATION == "time":
+        return logging.handlers.TimedRotatingFileHandler(
+            log_path,
+            when=LOG_ROTATE_WHEN,
+            backupCount=LOG_BACKUP_COUNT,
+            encoding='utf-8'
+        )
+    if LOG_ROTATION == "none":
+        return logging.FileHandler(log_path, encoding='utf-8')
+    return logging.handlers.RotatingFileHandler(
+        log_path,
+        maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUP_COUNT,
+        encoding='utf-8'
+    )
+
+def setup_logging(log_path: Path) -> logging.handlers.QueueListener:
+    """
+    Налаштовує кореневий логер: обробники лише кладуть записи в чергу,
+    а запис у консоль і файл виконує окремий потік QueueListener.
+    Записи з BufferingHandler, доданого до кореневого логера раніше, переносяться в лог.
+    """
+    formatter: logging.Formatter
+    if LOG_FORMAT == "json":
+        formatter = JsonLinesFormatter()
+    else:
+        formatter = logging.Formatter(TEXT_FORMAT)
+
+    handlers: List[logging.Handler] = [logging.StreamHandler(), _file_handler(log_path)]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+
+    root = logging.getLogger()
+    early_records: List[logging.LogRecord] = []
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        # Записи, накопичені до налаштування логування (під час імпорту, див. support_bot.py)
+        if isinstance(handler, logging.handlers.BufferingHandler):
+            early_records.extend(handler.buffer)
+    root.addHandler(TracebackQueueHandler(log_queue))
+    root.setLevel(LOG_LEVEL)
+    for record in early_records:
+        if record.levelno >= root.level:
+            root.handle(record)
+
+    listener.start()
+    # Дописуємо чергу й закриваємо файли при виході з процесу
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,117 @@
+"""
+Модуль для кешування file_id зображень, надісланих у Telegram.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from aiogram import Bot, types
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import FSInputFile
+
+# Файл, у якому зберігаються file_id між перезапусками
+MEDIA_CACHE_FILE = Path(__file__).parent.parent / "data" / "media_cache.json"
+
+# Фрагменти помилок Telegram, що означають недійсний file_id (а не, наприклад, розмітку підпису)
+FILE_ID_ERRORS = ("file identifier", "file_id", "file reference")
+
+def _is_file_id_error(error: TelegramBadRequest) -> bool:
+    message = (error.message or "").lower()
+    return any(fragment in message for fragment in FILE_ID_ERRORS)
+
+def _file_signature(path: Path) -> Tuple[int, int]:
+    """Повертає (mtime, розмір) файлу, щоб помітити заміну зображення"""
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+class MediaRegistry:
+    """Завантажує кожне зображення в Telegram один раз і далі надсилає його за file_id"""
+
+    def __init__(self, cache_path: Path):
+        self.cache_path = cache_path
+        # "bot_id:ім'я файлу" -> {"file_id", "mtime", "size"}
+        self._entries: Dict[str, Dict[str, object]] = self._load()
+        self.uploads = 0
+        self.cached_sends = 0
+
+    def _load(self) -> Dict[str, Dict[str, object]]:
+        """Читає кеш file_id з диска"""
+        try:
+            if self.cache_path.exists():
+                return json.loads(self.cache_path.read_text(encoding='utf-8'))
+        except Exception as e:
+            logging.error(f"Error loading media cache: {e}")
+        return {}
+
+    def _write(self, entries: Dict[str, Dict[str, object]]) -> None:
+        """Атомарно записує кеш file_id на диск"""
+        self.cache_path.parent.mkdir(exist_ok=True)
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(entries, ensure_ascii=False, indent=2), encoding='utf-8')
+        os.replace(tmp_path, self.cache_path)
+
+    async def _save(self) -> None:
+        """Зберігає кеш поза циклом подій"""
+        entries = dict(self._entries)
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, entries)
+        except Exception as e:
+            logging.error(f"Error saving media cache: {e}")
+
+    @staticmethod
+    def _key(bot: Bot, path: Path) -> str:
+        # file_id дійсний лише для бота, який його отримав
+        return f"{bot.id}:{path.name}"
+
+    def get_file_id(self, bot: Bot, path: Path) -> Optional[str]:
+        """Повертає збережений file_id, якщо зображення не змінювалося"""
+        entry = self._entries.get(self._key(bot, path))
+        if not entry:
+            return None
+        try:
+            if (entry.get("mtime"), entry.get("size")) != _file_signature(path):
+                return None
+        except OSError:
+            pass
+        return entry.get("file_id")
+
+    async def send_photo(self, bot: Bot, chat_id: int, path: Path, **kwargs) -> types.Message:
+        """Надсилає зображення за file_id, а якщо його немає або він відхилений - завантажує файл"""
+        key = self._key(bot, path)
+        file_id = self.get_file_id(bot, path)
+        if file_id:
+            try:
+                message = await bot.send_photo(chat_id, file_id, **kwargs)
+                self.cached_sends += 1
+                return message
+            except TelegramBadRequest as e:
+                # Інші помилки (зокрема "can't parse entities" у підписі) повторне
+                # завантаження не виправить - кеш не чіпаємо
+                if not _is_file_id_error(e):
+                    raise
+                logging.warning(f"Cached file_id for {path.name} was rejected, re-uploading: {e}")
+                self._entries.pop(key, None)
+
+        message = await bot.send_photo(chat_id, FSInputFile(path), **kwargs)
+        self.uploads += 1
+        if message.photo:
+            mtime, size = _file_signature(path)
+            self._entries[key] = {
+                # Найбільший розмір фото йде останнім
+                "file_id": message.photo[-1].file_id,
+                "mtime": mtime,
+                "size": size,
+            }
+            await self._save()
+        return message
+
+    async def answer_photo(self, message: types.Message, path: Path, **kwargs) -> types.Message:
+        """Аналог message.answer_photo з кешуванням file_id"""
+        return await self.send_photo(message.bot, message.chat.id, path, **kwargs)
+
+# Спільний для всього процесу реєстр зображень
+media_registry = MediaRegistry(MEDIA_CACHE_FILE)
@@ -0,0 +1,272 @@
+"""
+Модуль з метриками затримок і лічильниками бота.
+"""
+
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import TelegramObject
+
+# Межі кошиків гістограми в секундах
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.25,
+    0.35, 0.5, 0.75, 1.0, 1.5, 2.5, 5.0, 10.0
+)
+
+class Histogram:
+    """Гістограма з фіксованими кошиками та оцінкою квантилів"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        # Останній кошик - значення більші за найбільшу межу (+Inf)
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Оцінює квантиль лінійною інтерполяцією всередині кошика"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.bucket_counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if i == len(self.buckets):
+                    # Для кошика +Inf повертаємо найбільшу відому межу
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+class UpdateTiming:
+    """Дані про обробку одного оновлення, що накопичуються під час його обробки"""
+
+    __slots__ = ("handler_name", "api_time", "api_calls", "_api_active", "_api_busy_since")
+
+    def __init__(self):
+        self.handler_name: Optional[str] = None
+        # Час, коли виконувався хоча б один виклик Bot API (об'єднання інтервалів:
+        # одночасні виклики не сумуються, тож api_time не перевищує повного часу)
+        self.api_time = 0.0
+        self.api_calls = 0
+        self._api_active = 0
+        self._api_busy_since = 0.0
+
+    def api_call_started(self, now: float) -> None:
+        if not self._api_active:
+            self._api_busy_since = now
+        self._api_active += 1
+
+    def api_call_finished(self, now: float) -> None:
+        self._api_active -= 1
+        self.api_calls += 1
+        if not self._api_active:
+            self.api_time += now - self._api_busy_since
+
+# Оновлення, яке обробляється в поточній задачі
+current_update: "ContextVar[Optional[UpdateTiming]]" = ContextVar("current_update", default=None)
+
+class BotMetrics:
+    """Реєстр метрик процесу бота"""
+
+    def __init__(self):
+        # Обробник -> гістограма: повний час, час обробника без Bot API, час Bot API
+        self.update_latency: Dict[str, Histogram] = {}
+        self.handler_latency: Dict[str, Histogram] = {}
+        self.api_latency: Dict[str, Histogram] = {}
+        self.updates_total = 0
+        self.update_errors = 0
+        # Метод Bot API -> кількість викликів / помилок
+        self.api_calls: Dict[str, int] = {}
+        self.api_errors: Dict[str, int] = {}
+        self.faq_hits = 0
+        self.faq_misses = 0
+        # Показані списки схожих питань та вибрані з них відповіді
+        self.faq_suggestions = 0
+        self.faq_suggestions_chosen = 0
+        self.admin_escalations = 0
+        # Наскільки пізніше запланованого прокидається цикл подій
+        self.loop_lag = Histogram()
+        self.loop_lag_max = 0.0
+
+    @staticmethod
+    def _histogram(family: Dict[str, Histogram], name: str) -> Histogram:
+        histogram = family.get(name)
+        if histogram is None:
+            histogram = family[name] = Histogram()
+        return histogram
+
+    def observe_update(self, handler_name: str, total: float, api_time: float) -> None:
+        self.updates_total += 1
+        self._histogram(self.update_latency, handler_name).observe(total)
+        self._histogram(self.handler_latency, handler_name).observe(max(total - api_time, 0.0))
+        self._histogram(self.api_latency, handler_name).observe(api_time)
+
+    def observe_api_call(self, method: str, failed: bool) -> None:
+        self.api_calls[method] = self.api_calls.get(method, 0) + 1
+        if failed:
+            self.api_errors[method] = self.api_errors.get(method, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Поточні значення метрик з p50/p95/p99 для кожного обробника"""
+        return {
+            "updates_total": self.updates_total,
+            "update_errors": self.update_errors,
+            "handlers": {
+                name: {
+                    "total": histogram.summary(),
+                    "handler": self.handler_latency[name].summary(),
+                    "api": self.api_latency[name].summary(),
+                }
+                for name, histogram in self.update_latency.items()
+            },
+            "api_calls": dict(self.api_calls),
+            "api_errors": dict(self.api_errors),
+            "faq_hits": self.faq_hits,
+            "faq_misses": self.faq_misses,
+            "faq_suggestions": self.faq_suggestions,
+            "faq_suggestions_chosen": self.faq_suggestions_chosen,
+            "admin_escalations": self.admin_escalations,
+            "loop_lag": self.loop_lag.summary(),
+            "loop_lag_max": self.loop_lag_max,
+        }
+
+# Спільний для всього процесу реєстр метрик
+bot_metrics = BotMetrics()
+
+class UpdateTimingMiddleware(BaseMiddleware):
+    """Зовнішній middleware диспетчера: вимірює повний час обробки кожного оновлення"""
+
+    def __init__(self, metrics: BotMetrics = bot_metrics):
+        self.metrics = metrics
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        timing = UpdateTiming()
+        token = current_update.set(timing)
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            self.metrics.update_errors += 1
+            raise
+        finally:
+            current_update.reset(token)
+            self.metrics.observe_update(
+                timing.handler_name or "unhandled",
+                time.perf_counter() - start,
+                timing.api_time
+            )
+
+class HandlerNameMiddleware(BaseMiddleware):
+    """Внутрішній middleware: запам'ятовує, який обробник обрано для оновлення"""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        timing = current_update.get()
+        if timing is not None:
+            # Для кнопок справжній обробник знаходить таблиця маршрутів
+            callback = data.get("button_handler") or data["handler"].callback
+            timing.handler_name = getattr(callback, "__name__", type(callback).__name__)
+        return await handler(event, data)
+
+class ApiTimingMiddleware(BaseRequestMiddleware):
+    """
+    Middleware сесії бота: рахує виклики Bot API та їхній час. Підключається раніше
+    за обмеження швидкості (зовнішнім), тож час включає очікування ліміту та повтори
+    після 429 і не потрапляє в час обробника.
+    """
+
+    def __init__(self, metrics: BotMetrics = bot_metrics):
+        self.metrics = metrics
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType]
+    ) -> Response[TelegramType]:
+        timing = current_update.get()
+        if timing is not None:
+            timing.api_call_started(time.perf_counter())
+        failed = True
+        try:
+            response = await make_request(bot, method)
+            failed = False
+            return response
+        finally:
+            self.metrics.observe_api_call(method.__api_method__, failed)
+            if timing is not None:
+                timing.api_call_finished(time.perf_counter())
+
+def setup_metrics(dispatcher, bot: Bot, metrics: BotMetrics = bot_metrics) -> None:
+    """Підключає middleware метрик до диспетчера та сесії бота (до setup_outbound)"""
+    dispatcher.update.outer_middleware(UpdateTimingMiddleware(metrics))
+    dispatcher.message.middleware(HandlerNameMiddleware())
+    dispatcher.callback_query.middleware(HandlerNameMiddleware())
+    bot.session.middleware(ApiTimingMiddleware(metrics))
+
+async def log_metrics(interval: float, metrics: BotMetrics = bot_metrics) -> None:
+    """Фонова задача: періодично пише в лог p50/p95/p99 за обробниками"""
+    while True:
+        await asyncio.sleep(interval)
+        for name, histogram in sorted(metrics.update_latency.items()):
+            total = histogram.summary()
+            api = metrics.api_latency[name].summary()
+            logging.info(
+                f"Latency {name}: n={total['count']} "
+                f"p50={total['p50']:.3f}s p95={total['p95']:.3f}s p99={total['p99']:.3f}s "
+                f"(api p50={api['p50']:.3f}s)"
+            )
+        lag = metrics.loop_lag.summary()
+        if lag["count"]:
+            logging.info(
+                f"Event loop lag: p50={lag['p50']:.4f}s p99={lag['p99']:.4f}s max={metrics.loop_lag_max:.4f}s"
+            )
+        logging.info(
+            f"FAQ hits={metrics.faq_hits} misses={metrics.faq_misses} "
+            f"suggestions={metrics.faq_suggestions} chosen={metrics.faq_suggestions_chosen} "
+            f"admin escalations={metrics.admin_escalations}"
+        )
+
+async def monitor_loop_lag(interval: float, metrics: BotMetrics = bot_metrics) -> None:
+    """Фонова задача: вимірює, наскільки пізно прокидається цикл подій (блокуючий код у обробниках)"""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(loop.time() - started - interval, 0.0)
+        metrics.loop_lag.observe(lag)
+        metrics.loop_lag_max = max(metrics.loop_lag_max, lag)
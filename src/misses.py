@@ -0,0 +1,154 @@
+"""
+Модуль з журналом запитів, на які в FAQ не знайшлося відповіді.
+
+Кожен промах - рядок JSON Lines у data/faq_misses.jsonl:
+
+    {"ts": "2024-05-01 12:00:00", "query": "...", "best": "...", "score": 0.25, "suggested": 0, "tokens": [...]}
+
+де tokens - нормалізовані слова запиту, best і score - найкраще знайдене питання
+FAQ та його оцінка, suggested - скільки схожих питань запропоновано кнопками.
+Журнал групує scripts/cluster_faq_misses.py, щоб знайти, які питання варто додати в FAQ.
+Коли файл перевищує FAQ_MISS_LOG_MAX_BYTES, він перейменовується на faq_misses.jsonl.1
+(попередні зсуваються до .FAQ_MISS_LOG_BACKUP_COUNT, найстаріший видаляється).
+"""
+
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .config import (
+    FAQ_MISS_LOG_PATH,
+    FAQ_MISS_LOG_BATCH_SIZE,
+    FAQ_MISS_LOG_FLUSH_INTERVAL,
+    FAQ_MISS_LOG_MAX_BYTES,
+    FAQ_MISS_LOG_BACKUP_COUNT
+)
+from .faq import MatchResult, preprocess_text
+
+# Довші запити обрізаються, щоб журнал лишався компактним
+MAX_QUERY_LENGTH = 500
+
+class MissLogWriter:
+    """Буферизований запис промахів FAQ: записи накопичуються в пам'яті й дописуються в журнал пакетами у фоні"""
+
+    def __init__(self, path: str = FAQ_MISS_LOG_PATH, batch_size: int = FAQ_MISS_LOG_BATCH_SIZE,
+                 flush_interval: float = FAQ_MISS_LOG_FLUSH_INTERVAL,
+                 max_bytes: int = FAQ_MISS_LOG_MAX_BYTES, backup_count: int = FAQ_MISS_LOG_BACKUP_COUNT):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._buffer: List[Dict[str, Any]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self.recorded = 0
+        self.written = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def record(self, query: str, result: MatchResult, suggested: int = 0) -> None:
+        """Додає промах у буфер (нормалізація слів відкладається до запису)"""
+        if not self.enabled:
+            return
+        self._buffer.append({
+            "ts": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "query": query[:MAX_QUERY_LENGTH],
+            "best": result.key,
+            "score": round(result.score, 4),
+            "suggested": suggested,
+        })
+        self.recorded += 1
+        if len(self._buffer) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self) -> Optional[asyncio.Task]:
+        """Запускає фонову задачу запису (якщо журнал увімкнено)"""
+        if not self.enabled:
+            return None
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logging.error(f"Error saving FAQ misses: {e}")
+
+    def _write_rows(self, rows: List[Dict[str, Any]], sync: bool) -> None:
+        """Дописує пакет промахів у журнал (виконується поза циклом подій)"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        lines = [
+            json.dumps({**row, "tokens": preprocess_text(row["query"])}, ensure_ascii=False) + "\n"
+            for row in rows
+        ]
+        if self.max_bytes > 0:
+            size = sum(len(line.encode('utf-8')) for line in lines)
+            try:
+                current = os.path.getsize(self.path)
+            except FileNotFoundError:
+                current = 0
+            if current > 0 and current + size > self.max_bytes:
+                self._rotate()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.writelines(lines)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _rotate(self) -> None:
+        """Зсуває попередні файли журналу (як RotatingFileHandler); без копій файл просто очищується"""
+        if self.backup_count <= 0:
+            os.remove(self.path)
+            return
+        for i in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    async def flush(self, sync: bool = False) -> None:
+        """Записує накопичені промахи; sync=True додатково викликає fsync"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            if not self._buffer:
+                return
+            rows, self._buffer = self._buffer, []
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self._write_rows, rows, sync)
+            except Exception:
+                # Повертаємо записи в буфер, щоб не втратити їх
+                self._buffer[:0] = rows
+                raise
+            self.written += len(rows)
+
+    async def close(self) -> None:
+        """Зупиняє фонову задачу та синхронно скидає залишок буфера на диск"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await self.flush(sync=True)
+        except Exception as e:
+            logging.error(f"Error saving FAQ misses on shutdown: {e}")
+
+# Спільний для всього процесу журнал промахів
+miss_log = MissLogWriter()
@@ -0,0 +1,86 @@
+"""
+Модуль з нормалізацією тексту запитів і питань FAQ: регістр, українські
+літери, схожі латинські літери в кириличних словах та назви програм.
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+# Слово: літери та цифри, можливо з дефісами всередині ("wi-fi", "pdf-файлы")
+WORD_PATTERN = re.compile(r"\w+(?:-\w+)*")
+CYRILLIC_PATTERN = re.compile(r"[а-яё]")
+
+# Українські літери та ё зводимо до російських, щоб "міт" і "мит" збігалися
+LETTER_FOLDING = str.maketrans({
+    "і": "и",
+    "ї": "и",
+    "є": "е",
+    "ґ": "г",
+    "ё": "е",
+})
+
+# Латинські літери, схожі на кириличні (в словах, набраних кирилицею)
+HOMOGLYPHS = str.maketrans("aceopxyk", "асеорхук")
+
+# Написання назв програм кирилицею -> канонічна назва (ключі - після LETTER_FOLDING)
+ALIASES: Dict[str, str] = {
+    "гугл": "google",
+    "мит": "meet",
+    "телеграм": "telegram",
+    "телеграмм": "telegram",
+    "телега": "telegram",
+    "хром": "chrome",
+    "либреофис": "libreoffice",
+    "виндовс": "windows",
+    "винда": "windows",
+    "мак": "mac",
+    "макос": "mac",
+    "macos": "mac",
+    "зум": "zoom",
+    "анидеск": "anydesk",
+    "энидеск": "anydesk",
+    "капкат": "capcut",
+    "яваре": "yaware",
+    "яваер": "yaware",
+}
+
+# Назви з кількох слів, що зводяться до одного слова
+PHRASE_ALIASES: Dict[Tuple[str, ...], str] = {
+    ("google", "meet"): "meet",
+    ("google", "chrome"): "chrome",
+    ("mac", "os"): "mac",
+    ("mac", "ос"): "mac",
+}
+MAX_PHRASE_LENGTH = max(len(phrase) for phrase in PHRASE_ALIASES)
+
+def normalize_word(word: str) -> str:
+    """Нормалізує одне слово (вже в нижньому регістрі)"""
+    word = word.translate(LETTER_FOLDING)
+    if CYRILLIC_PATTERN.search(word):
+        # Частини через дефіс перевіряємо окремо: "pdf-файлы" лишається латиницею
+        word = "-".join(
+            part.translate(HOMOGLYPHS) if CYRILLIC_PATTERN.search(part) else part
+            for part in word.split("-")
+        )
+    return ALIASES.get(word, word)
+
+def normalize_tokens(text: str) -> List[str]:
+    """Розбиває текст на нормалізовані слова та зводить назви програм до канонічних"""
+    words = [normalize_word(word) for word in WORD_PATTERN.findall(text.lower())]
+    tokens: List[str] = []
+    i = 0
+    while i < len(words):
+        for length in range(min(MAX_PHRASE_LENGTH, len(words) - i), 1, -1):
+            canonical = PHRASE_ALIASES.get(tuple(words[i:i + length]))
+            if canonical is not None:
+                tokens.append(canonical)
+                i += length
+                break
+        else:
+            tokens.append(words[i])
+            i += 1
+    return tokens
+
+def normalize_text(text: str) -> str:
+    """Нормалізований текст одним рядком (ключ для порівняння запитів)"""
+    return " ".join(normalize_tokens(text))
@@ -0,0 +1,258 @@
+"""
+Модуль з централізованим відправленням повідомлень: обмеження швидкості,
+пріоритети та повтор запитів після 429 від Telegram.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from bisect import insort
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import count
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from .config import (
+    OUTBOUND_GLOBAL_RATE,
+    OUTBOUND_GLOBAL_BURST,
+    OUTBOUND_CHAT_RATE,
+    OUTBOUND_CHAT_BURST,
+    OUTBOUND_GROUP_RATE,
+    OUTBOUND_GROUP_BURST,
+    OUTBOUND_MAX_RETRIES
+)
+from .texts import ADMIN_CHAT_ID, TRACKER_ADMIN_CHAT_ID
+
+# Пріоритети (менше число - раніше)
+PRIORITY_ADMIN = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+# Методи, що створюють або змінюють повідомлення в чаті і підпадають під ліміти Telegram
+RATE_LIMITED_METHODS = frozenset({
+    "sendMessage", "sendPhoto", "sendDocument", "sendAudio", "sendVideo",
+    "sendAnimation", "sendVoice", "sendVideoNote", "sendMediaGroup", "sendSticker",
+    "sendLocation", "sendVenue", "sendContact", "sendPoll", "sendDice",
+    "copyMessage", "forwardMessage",
+    "editMessageText", "editMessageCaption", "editMessageMedia", "editMessageReplyMarkup"
+})
+
+# Пріоритет повідомлень, заданий обробником (None - визначається за чатом)
+current_priority: "ContextVar[Optional[int]]" = ContextVar("outbound_priority", default=None)
+
+@contextmanager
+def outbound_priority(priority: int) -> Iterator[None]:
+    """Задає пріоритет для повідомлень, надісланих усередині блоку with"""
+    token = current_priority.set(priority)
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+class TokenBucket:
+    """Token bucket: rate токенів за секунду, не більше capacity"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated_at", "blocked_until")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, now: float) -> float:
+        """Через скільки секунд з'явиться токен (0 - вже є)"""
+        self.refill(now)
+        blocked = max(0.0, self.blocked_until - now)
+        if self.tokens >= 1:
+            return blocked
+        return max(blocked, (1 - self.tokens) / self.rate)
+
+    def consume(self) -> None:
+        self.tokens -= 1
+
+    def is_idle(self, now: float) -> bool:
+        self.refill(now)
+        return self.tokens >= self.capacity and self.blocked_until <= now
+
+class OutboundLimiter:
+    """
+    Видає дозволи на відправлення з урахуванням глобального ліміту та ліміту
+    кожного чату. Очікувачі обслуговуються за пріоритетом, а в межах пріоритету -
+    в порядку надходження, тож порядок повідомлень у чаті зберігається.
+    """
+
+    # Скільки неактивних чатів тримати в пам'яті
+    MAX_CHAT_BUCKETS = 10000
+
+    def __init__(self, global_rate: float = OUTBOUND_GLOBAL_RATE, global_burst: float = OUTBOUND_GLOBAL_BURST,
+                 chat_rate: float = OUTBOUND_CHAT_RATE, chat_burst: float = OUTBOUND_CHAT_BURST,
+                 group_rate: float = OUTBOUND_GROUP_RATE, group_burst: float = OUTBOUND_GROUP_BURST):
+        self._global = TokenBucket(global_rate, global_burst)
+        self.chat_rate, self.chat_burst = chat_rate, chat_burst
+        self.group_rate, self.group_burst = group_rate, group_burst
+        self._chats: "OrderedDict[int, TokenBucket]" = OrderedDict()
+        # Відсортований список (пріоритет, номер, чат, future)
+        self._waiters: List[Tuple[int, int, int, asyncio.Future]] = []
+        self._sequence = count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._pump_task: Optional[asyncio.Task] = None
+        self.granted = 0
+        self.delayed = 0
+        self.retries = 0
+        self.gave_up = 0
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            # Від'ємні ідентифікатори - групи та канали з жорсткішим лімітом
+            if chat_id < 0:
+                bucket = TokenBucket(self.group_rate, self.group_burst)
+            else:
+                bucket = TokenBucket(self.chat_rate, self.chat_burst)
+            self._chats[chat_id] = bucket
+            self._evict_idle()
+        else:
+            self._chats.move_to_end(chat_id)
+        return bucket
+
+    def _evict_idle(self) -> None:
+        now = time.monotonic()
+        while len(self._chats) > self.MAX_CHAT_BUCKETS:
+            chat_id, bucket = next(iter(self._chats.items()))
+            if not bucket.is_idle(now):
+                break
+            del self._chats[chat_id]
+
+    def block(self, chat_id: int, seconds: float) -> None:
+        """Призупиняє відправлення в чат (після 429 з retry_after)"""
+        bucket = self._chat_bucket(chat_id)
+        bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + seconds)
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, chat_id: int, priority: int = PRIORITY_NORMAL) -> None:
+        """Чекає, доки можна буде надіслати повідомлення в чат"""
+        now = time.monotonic()
+        bucket = self._chat_bucket(chat_id)
+        if not self._waiters and self._global.wait_time(now) == 0 and bucket.wait_time(now) == 0:
+            # Швидкий шлях: черга порожня і токени є
+            self._global.consume()
+            bucket.consume()
+            self.granted += 1
+            return
+
+        self.delayed += 1
+        future = asyncio.get_running_loop().create_future()
+        insort(self._waiters, (priority, next(self._sequence), chat_id, future))
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.create_task(self._pump())
+        await future
+
+    async def _pump(self) -> None:
+        """Видає дозволи очікувачам, поки черга не спорожніє"""
+        while self._waiters:
+            now = time.monotonic()
+            wait = self._global.wait_time(now)
+            if wait == 0:
+                wait = float("inf")
+                for entry in list(self._waiters):
+                    priority, _, chat_id, future = entry
+                    if future.done():
+                        # Задачу скасували, поки вона чекала
+                        self._waiters.remove(entry)
+                        continue
+                    bucket = self._chat_bucket(chat_id)
+                    chat_wait = bucket.wait_time(now)
+                    if chat_wait == 0:
+                        self._global.consume()
+                        bucket.consume()
+                        self._waiters.remove(entry)
+                        future.set_result(None)
+                        self.granted += 1
+                        wait = 0
+                        break
+                    wait = min(wait, chat_wait)
+            if wait == 0:
+                continue
+            if not self._waiters:
+                break
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+class OutboundRateLimitMiddleware(BaseRequestMiddleware):
+    """Middleware сесії бота: обмежує швидкість відправлення і повторює запити після 429"""
+
+    def __init__(self, limiter: OutboundLimiter, max_retries: int = OUTBOUND_MAX_RETRIES,
+                 admin_chat_ids: Iterable[int] = (ADMIN_CHAT_ID, TRACKER_ADMIN_CHAT_ID)):
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.admin_chat_ids = frozenset(admin_chat_ids)
+
+    def priority_for(self, chat_id: int) -> int:
+        priority = current_priority.get()
+        if priority is not None:
+            return priority
+        return PRIORITY_ADMIN if chat_id in self.admin_chat_ids else PRIORITY_NORMAL
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType]
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        # Ліміти рахуємо лише для числових ідентифікаторів чатів (не @username)
+        limited = method.__api_method__ in RATE_LIMITED_METHODS and isinstance(chat_id, int)
+        attempt = 0
+        while True:
+            if limited:
+                await self.limiter.acquire(chat_id, self.priority_for(chat_id))
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                attempt += 1
+                if attempt > self.max_retries:
+                    self.limiter.gave_up += 1
+                    raise
+                self.limiter.retries += 1
+                if limited:
+                    self.limiter.block(chat_id, e.retry_after)
+                # Випадкова добавка, щоб повтори не прийшли одночасно
+                delay = e.retry_after + random.uniform(0, 0.1 * e.retry_after + 0.5)
+                logging.warning(
+                    f"Flood limit on {method.__api_method__} (chat {chat_id}), "
+                    f"retry {attempt}/{self.max_retries} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+# Спільний для всього процесу обмежувач
+outbound_limiter = OutboundLimiter()
+
+def setup_outbound(bot: Bot, limiter: OutboundLimiter = outbound_limiter) -> OutboundRateLimitMiddleware:
+    """Підключає обмеження швидкості до сесії бота (після setup_metrics: middleware сесії,
+    підключені раніше, виконуються зовні й бачать очікування ліміту)"""
+    middleware = OutboundRateLimitMiddleware(limiter)
+    bot.session.middleware(middleware)
+    return middleware
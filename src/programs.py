@@ -0,0 +1,41 @@
+"""
+Модуль з розпізнаванням програми в запиті формату "Название программы: проблема".
+"""
+
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from .normalize import normalize_tokens, normalize_word
+from .texts import PROGRAM_INFO
+
+# Програма -> нормалізовані слова, за якими її впізнаємо
+PROGRAMS: Dict[str, FrozenSet[str]] = {
+    **{program: frozenset({normalize_word(program)}) for program in PROGRAM_INFO},
+    "yaware": frozenset({"yaware", "трекер", "плагин"}),
+    "meet": frozenset({"meet"}),
+    "zoom": frozenset({"zoom"}),
+    "windows": frozenset({"windows"}),
+    "mac": frozenset({"mac"}),
+}
+
+# Слово -> програма
+PROGRAM_WORDS: Dict[str, str] = {
+    word: program for program, words in PROGRAMS.items() for word in words
+}
+
+def programs_in(words: Iterable[str]) -> List[str]:
+    """Програми, згадані серед нормалізованих слів (у порядку згадки, без повторів)"""
+    found = (PROGRAM_WORDS.get(word) for word in words)
+    return list(dict.fromkeys(program for program in found if program is not None))
+
+def split_program(text: str) -> Tuple[Optional[str], str]:
+    """
+    Розбирає запит "Программа: проблема" на (програма, проблема).
+    Якщо двокрапки немає або програму не впізнано, повертає (None, text).
+    """
+    name, separator, problem = text.partition(":")
+    if not separator or not problem.strip():
+        return None, text
+    programs = programs_in(normalize_tokens(name))
+    if len(programs) != 1:
+        return None, text
+    return programs[0], problem.strip()
@@ -0,0 +1,213 @@
+"""
+Модуль з ендпоінтом /metrics у текстовому форматі Prometheus.
+"""
+
+import logging
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from aiohttp import web
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from .config import BOT_MODE, METRICS_HOST, METRICS_PORT, METRICS_PATH
+from .faq import faq_store, query_cache
+from .metrics import BotMetrics, Histogram, bot_metrics
+from .outbound import outbound_limiter
+from .ratings import rating_stats
+from .storage import SQLiteStorage
+from .tickets import ticket_counter
+from .webhook import add_health_route
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PROCESS_START_TIME = time.time()
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class MetricsWriter:
+    """Збирає рядки експозиції Prometheus"""
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def metric(self, name: str, kind: str, help_text: str,
+               samples: Iterable[Tuple[Labels, float]]) -> None:
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            self.lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    def histogram(self, name: str, help_text: str, label: str,
+                  histograms: Dict[str, Histogram]) -> None:
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} histogram")
+        for label_value, histogram in sorted(histograms.items()):
+            cumulative = 0
+            bounds = list(histogram.buckets) + [float("inf")]
+            for bound, bucket_count in zip(bounds, histogram.bucket_counts):
+                cumulative += bucket_count
+                labels = ((label, label_value), ("le", _format_value(bound)))
+                self.lines.append(f"{name}_bucket{_format_labels(labels)} {cumulative}")
+            labels = ((label, label_value),)
+            self.lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+            self.lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+def _storage_sizes(storage: Optional[BaseStorage]) -> Tuple[Optional[int], Optional[int]]:
+    """(розмов у пам'яті, розмов у базі) без звернення до диска"""
+    if isinstance(storage, SQLiteStorage):
+        return storage.cache_len(), storage.stored_count
+    if isinstance(storage, MemoryStorage):
+        return len(storage.storage), None
+    return None, None
+
+def render_metrics(storage: Optional[BaseStorage] = None, metrics: BotMetrics = bot_metrics) -> str:
+    """Формує текст /metrics лише зі значень у пам'яті (без блокуючих збирачів)"""
+    writer = MetricsWriter()
+
+    # Процес
+    writer.metric("process_cpu_seconds_total", "counter", "Total user and system CPU time.",
+                  [((), time.process_time())])
+    writer.metric("process_start_time_seconds", "gauge", "Start time of the process since unix epoch.",
+                  [((), PROCESS_START_TIME)])
+    if resource is not None:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux повертає кілобайти, macOS - байти
+        if sys.platform != "darwin":
+            max_rss *= 1024
+        writer.metric("process_max_resident_memory_bytes", "gauge", "Peak resident memory size.",
+                      [((), max_rss)])
+
+    # Оновлення та обробники
+    writer.metric("supportbot_updates_total", "counter", "Updates handled.",
+                  [((), metrics.updates_total)])
+    writer.metric("supportbot_update_errors_total", "counter", "Updates that raised an error.",
+                  [((), metrics.update_errors)])
+    writer.histogram("supportbot_update_duration_seconds", "End-to-end update handling time.",
+                     "handler", metrics.update_latency)
+    writer.histogram("supportbot_handler_duration_seconds", "Update handling time excluding Bot API calls.",
+                     "handler", metrics.handler_latency)
+    writer.histogram("supportbot_handler_api_duration_seconds",
+                     "Wall-clock time per update with a Bot API call in flight (rate-limit waits included).",
+                     "handler", metrics.api_latency)
+
+    writer.histogram("supportbot_event_loop_lag_seconds", "How late the event loop wakes up from a timer.",
+                     "loop", {"main": metrics.loop_lag})
+    writer.metric("supportbot_event_loop_lag_max_seconds", "gauge", "Largest event loop lag observed.",
+                  [((), metrics.loop_lag_max)])
+
+    # Вихідні виклики Bot API
+    writer.metric("supportbot_api_calls_total", "counter", "Outbound Bot API calls.",
+                  [((("method", method),), count) for method, count in sorted(metrics.api_calls.items())])
+    writer.metric("supportbot_api_errors_total", "counter", "Outbound Bot API calls that failed.",
+                  [((("method", method),), count) for method, count in sorted(metrics.api_errors.items())])
+
+    writer.metric("supportbot_outbound_queue_depth", "gauge", "Messages waiting for a rate-limit slot.",
+                  [((), outbound_limiter.queue_depth)])
+    writer.metric("supportbot_outbound_delayed_total", "counter", "Messages that had to wait for a slot.",
+                  [((), outbound_limiter.delayed)])
+    writer.metric("supportbot_outbound_retries_total", "counter", "Requests retried after a 429 response.",
+                  [((), outbound_limiter.retries)])
+    writer.metric("supportbot_outbound_gave_up_total", "counter", "Requests that failed after all 429 retries.",
+                  [((), outbound_limiter.gave_up)])
+
+    # FAQ
+    faq_stats = faq_store.stats()
+    writer.metric("supportbot_faq_hits_total", "counter", "Help requests answered from the FAQ.",
+                  [((), metrics.faq_hits)])
+    writer.metric("supportbot_faq_misses_total", "counter", "Help requests without an FAQ answer.",
+                  [((), metrics.faq_misses)])
+    writer.metric("supportbot_faq_suggestions_total", "counter", "Help requests answered with similar FAQ questions.",
+                  [((), metrics.faq_suggestions)])
+    writer.metric("supportbot_faq_suggestions_chosen_total", "counter", "Suggested FAQ questions picked by users.",
+                  [((), metrics.faq_suggestions_chosen)])
+    writer.metric("supportbot_faq_cache_hits_total", "counter", "FAQ searches served from the query cache.",
+                  [((), query_cache.hits)])
+    writer.metric("supportbot_faq_cache_misses_total", "counter", "FAQ searches that ran against the index.",
+                  [((), query_cache.misses)])
+    writer.metric("supportbot_faq_cache_entries", "gauge", "Results held in the FAQ query cache.",
+                  [((), len(query_cache))])
+    writer.metric("supportbot_faq_entries", "gauge", "Questions in the FAQ index.",
+                  [((), faq_stats["entries"])])
+    writer.metric("supportbot_faq_vocabulary_size", "gauge", "Distinct words in the FAQ index.",
+                  [((), faq_stats["vocabulary"])])
+    writer.metric("supportbot_faq_reloads_total", "counter", "Successful FAQ loads.",
+                  [((), faq_stats["reload_count"])])
+    writer.metric("supportbot_faq_reload_errors_total", "counter", "Failed FAQ reloads.",
+                  [((), faq_stats["reload_errors"])])
+    if faq_stats["last_load_time"] is not None:
+        writer.metric("supportbot_faq_last_load_timestamp_seconds", "gauge", "Time of the last FAQ load.",
+                      [((), faq_stats["last_load_time"])])
+
+    # Звернення та оцінки
+    writer.metric("supportbot_admin_escalations_total", "counter", "Requests forwarded to admins.",
+                  [((), metrics.admin_escalations)])
+    # Значення на процес: кожен процес видає номери зі своїх зарезервованих блоків,
+    # тож у кількох процесів вони різні й не дорівнюють загальній кількості звернень
+    writer.metric("supportbot_ticket_last_issued", "gauge",
+                  "Last ticket number issued by this process (per process, not a shared total).",
+                  [((), ticket_counter.last_issued)])
+    rating_summary = rating_stats.summary()
+    writer.metric("supportbot_ratings_total", "counter", "Ratings received, by rating value.",
+                  [((("rating", rating),), count) for rating, count in sorted(rating_summary["counts"].items())])
+    if rating_summary["mean"] is not None:
+        writer.metric("supportbot_rating_mean", "gauge", "Mean star rating.",
+                      [((), rating_summary["mean"])])
+    # Голоси за поточну добу та годину (кошики статистики за часом)
+    now = datetime.now()
+    writer.metric("supportbot_ratings_recent", "gauge", "Ratings received in the current day and hour.",
+                  [((("period", "day"),), rating_summary["daily"].get(now.strftime('%Y-%m-%d'), 0)),
+                   ((("period", "hour"),), rating_summary["hourly"].get(now.strftime('%Y-%m-%d %H'), 0))])
+
+    # FSM-сховище
+    cached, stored = _storage_sizes(storage)
+    if cached is not None:
+        writer.metric("supportbot_fsm_cached_conversations", "gauge", "Conversations held in memory.",
+                      [((), cached)])
+    if stored is not None:
+        writer.metric("supportbot_fsm_stored_conversations", "gauge",
+                      "Conversations in the FSM database at the last sweep.", [((), stored)])
+
+    return writer.render()
+
+def add_metrics_route(app: web.Application, storage: Optional[BaseStorage] = None) -> None:
+    """Додає ендпоінт METRICS_PATH до aiohttp-застосунку"""
+
+    async def metrics_view(request: web.Request) -> web.Response:
+        return web.Response(body=render_metrics(storage).encode("utf-8"),
+                            headers={"Content-Type": CONTENT_TYPE})
+
+    app.router.add_get(METRICS_PATH, metrics_view)
+
+async def start_metrics_server(storage: Optional[BaseStorage] = None) -> web.AppRunner:
+    """Запускає окремий HTTP-сервер метрик у поточному циклі подій"""
+    app = web.Application()
+    add_metrics_route(app, storage)
+    add_health_route(app, mode=BOT_MODE)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, METRICS_HOST, METRICS_PORT).start()
+    logging.info(f"Metrics server listening on {METRICS_HOST}:{METRICS_PORT}{METRICS_PATH}")
+    return runner
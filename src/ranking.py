@@ -0,0 +1,127 @@
+"""
+Модуль з TF-IDF ранжуванням питань FAQ (косинусна схожість на NumPy).
+"""
+
+import math
+from collections import Counter
+from typing import TYPE_CHECKING, List, Mapping, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy не встановлено - доступний лише підрядковий пошук
+    np = None
+
+if TYPE_CHECKING:
+    from .faq import FAQIndex
+
+def numpy_available() -> bool:
+    return np is not None
+
+class TfidfRanker:
+    """
+    Оцінює всі питання FAQ одразу: косинусна схожість TF-IDF векторів.
+    Ваги слів зберігаються по стовпцях (як у CSC-матриці): для слова t
+    номери питань і ваги лежать у doc_ids/weights[term_ptr[t]:term_ptr[t + 1]].
+    """
+
+    def __init__(self, index: "FAQIndex", documents: Optional[List[List[str]]] = None,
+                 arrays: Optional[Mapping[str, "np.ndarray"]] = None,
+                 term_ids: Optional[Mapping[str, int]] = None):
+        """
+        Масиви будуються зі слів питань documents або беруться готовими (arrays
+        і term_ids скомпільованого індексу, див. compiled_faq)
+        """
+        if np is None:
+            raise RuntimeError("NumPy is required for the tfidf FAQ engine")
+        self.index = index
+        self.size = len(index)
+        # Вага слова запиту, якого немає в FAQ (як у слова, що не зустрічається в жодному питанні)
+        self.unknown_idf = math.log(1 + self.size) + 1
+        if arrays is not None:
+            self.term_ids: Mapping[str, int] = term_ids
+            self.idf = arrays["idf"]
+            self.term_ptr = arrays["term_ptr"]
+            self.doc_ids = arrays["doc_ids"]
+            self.weights = arrays["weights"]
+            return
+        self.term_ids = {word: term_id for term_id, word in enumerate(index.postings)}
+
+        # Згладжений IDF: рідкісні слова важать більше за поширені
+        document_frequency = np.array([len(index.postings[word]) for word in self.term_ids], dtype=np.float64)
+        self.idf = np.log((1 + self.size) / (1 + document_frequency)) + 1
+
+        term_counts = [Counter(self.term_ids[word] for word in words) for words in documents]
+        norms = np.zeros(self.size)
+        for doc_id, counts in enumerate(term_counts):
+            norms[doc_id] = math.sqrt(sum((count * self.idf[t]) ** 2 for t, count in counts.items()))
+        norms[norms == 0] = 1.0
+
+        # Стовпці: слово -> (питання, нормована вага)
+        columns: List[List[Tuple[int, float]]] = [[] for _ in self.term_ids]
+        for doc_id, counts in enumerate(term_counts):
+            for term_id, count in counts.items():
+                columns[term_id].append((doc_id, count * self.idf[term_id] / norms[doc_id]))
+        self.term_ptr = np.zeros(len(columns) + 1, dtype=np.int64)
+        self.term_ptr[1:] = np.cumsum([len(column) for column in columns])
+        self.doc_ids = np.array([doc_id for column in columns for doc_id, _ in column], dtype=np.int64)
+        self.weights = np.array([weight for column in columns for _, weight in column], dtype=np.float64)
+
+    def scores(self, query_words: List[str]) -> Optional["np.ndarray"]:
+        """Косинусна схожість запиту з кожним питанням (None, якщо збігів немає)"""
+        counts = Counter(query_words)
+        # Для кожного слова запиту: його вага і слова FAQ, з якими воно збігається за підрядком
+        word_weights: List[float] = []
+        term_ids: List[int] = []
+        term_similarity: List[float] = []
+        term_rows: List[int] = []
+        unknown_weight = 0.0
+        for word, occurrences in counts.items():
+            related = self.index.related_words(word)
+            if not related:
+                unknown_weight += (occurrences * self.unknown_idf) ** 2
+                continue
+            row = len(word_weights)
+            best_idf = 0.0
+            for related_word in related:
+                term_id = self.term_ids[related_word]
+                term_ids.append(term_id)
+                # Точний збіг важить 1, часткове входження - пропорційно довжині
+                term_similarity.append(min(len(word), len(related_word)) / max(len(word), len(related_word)))
+                term_rows.append(row)
+                best_idf = max(best_idf, self.idf[term_id])
+            word_weights.append(occurrences * best_idf)
+        if not word_weights:
+            return None
+
+        weights = np.array(word_weights)
+        query_norm = math.sqrt(float(np.dot(weights, weights)) + unknown_weight)
+
+        # Збираємо стовпці всіх пов'язаних слів в один масив позицій
+        term_array = np.array(term_ids, dtype=np.int64)
+        starts, ends = self.term_ptr[term_array], self.term_ptr[term_array + 1]
+        lengths = ends - starts
+        positions = np.repeat(ends - lengths.cumsum(), lengths) + np.arange(lengths.sum())
+        values = self.weights[positions] * np.repeat(term_similarity, lengths)
+        # Слово запиту зараховується питанню один раз - за найкращим збігом
+        best = np.zeros(len(word_weights) * self.size)
+        cells = np.repeat(term_rows, lengths) * self.size + self.doc_ids[positions]
+        np.maximum.at(best, cells, values)
+        return weights @ best.reshape(len(word_weights), self.size) / query_norm
+
+    def top_matches(self, query_words: List[str], k: int,
+                    entries: Optional[List[int]] = None) -> List[Tuple[int, float]]:
+        """До k найкращих (номер питання, оцінка) серед entries (None - серед усіх)"""
+        scores = self.scores(query_words)
+        if scores is None:
+            return []
+        entry_ids = np.arange(self.size) if entries is None else np.asarray(entries, dtype=np.int64)
+        # Питання без жодного спільного слова не пропонуємо
+        entry_ids = entry_ids[scores[entry_ids] > 0]
+        if len(entry_ids) > k:
+            # Частковий відбір без повного сортування: лишаємо оцінки не нижчі за k-ту
+            kth_score = -np.partition(-scores[entry_ids], k - 1)[k - 1]
+            entry_ids = entry_ids[scores[entry_ids] >= kth_score]
+        # При рівності перемагає питання, вище у файлі
+        order = np.lexsort((entry_ids, -scores[entry_ids]))[:k]
+        # Обрізаємо похибку округлення (1.0000000000000002)
+        return [(int(entry_ids[i]), min(float(scores[entry_ids[i]]), 1.0)) for i in order]
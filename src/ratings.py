@@ -2,11 +2,17 @@
 Модуль для роботи з оцінками бота.
 """
 
+import asyncio
 import csv
+import io
 import os
+import threading
+from collections import Counter
 from datetime import datetime
 import logging
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple, Union
+
+from .config import RATINGS_BATCH_SIZE, RATINGS_FLUSH_INTERVAL, RATINGS_STATS_DAYS, RATINGS_STATS_HOURS
 
 # Шлях до файлу з оцінками
 RATINGS_FILE = os.path.join(os.path.dirname(__file__), "..", "data", "ratings.csv")
@@ -17,11 +23,12 @@ ADMIN_CHAT_ID = -1002490051402
 # Список адміністраторів (замініть на реальні ID)
 ADMIN_IDS = [7613724879]
 
-def ensure_ratings_file():
+def ensure_ratings_file(path: Optional[str] = None):
     """Перевіряє наявність файлу з оцінками та створює його при необхідності."""
-    os.makedirs(os.path.dirname(RATINGS_FILE), exist_ok=True)
-    if not os.path.exists(RATINGS_FILE):
-        with open(RATINGS_FILE, 'w', newline='', encoding='utf-8') as f:
+    path = path or RATINGS_FILE
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if not os.path.exists(path):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(['user_id', 'timestamp', 'rating'])
 
@@ -39,24 +46,204 @@ def save_rating(user_id: int, rating: str) -> bool:
         logging.error(f"Error saving rating: {e}")
         return False
 
-def get_stats() -> Tuple[int, int]:
-    """Повертає статистику оцінок (кількість лайків і дизлайків)."""
+def _prune(counter: Counter, keep: int) -> None:
+    """Лишає keep найновіших ключів (ключі - дати, тож рядки сортуються за часом)"""
+    if len(counter) > keep:
+        for key in sorted(counter)[:len(counter) - keep]:
+            del counter[key]
+
+class RatingStats:
+    """Накопичувальна статистика оцінок, що оновлюється з кожним голосом"""
+
+    def __init__(self, days: int = RATINGS_STATS_DAYS, hours: int = RATINGS_STATS_HOURS):
+        self._lock = threading.Lock()
+        self.counts: Counter = Counter()
+        # Кількість голосів за останні days днів ("YYYY-MM-DD") і hours годин ("YYYY-MM-DD HH")
+        self.days = days
+        self.hours = hours
+        self.daily: Counter = Counter()
+        self.hourly: Counter = Counter()
+        self.total = 0
+        # Сума та кількість числових оцінок (зірочок) для середнього
+        self.stars_sum = 0
+        self.stars_count = 0
+        self.bootstrapped = False
+        # Розмір CSV до першого голосу цього процесу: історія для bootstrap - лише до цієї межі,
+        # пізніші рядки вже враховані через add
+        self.history_limit: Optional[int] = None
+
+    def add(self, rating: str, timestamp: str) -> None:
+        """Враховує одну оцінку; timestamp у форматі '%Y-%m-%d %H:%M:%S'"""
+        with self._lock:
+            self.counts[rating] += 1
+            self.total += 1
+            if rating.isdigit():
+                self.stars_sum += int(rating)
+                self.stars_count += 1
+            day, hour = timestamp[:10], timestamp[:13]
+            self.daily[day] += 1
+            self.hourly[hour] += 1
+            # Старі кошики видаляються лише з появою нового дня/години
+            if self.daily[day] == 1:
+                _prune(self.daily, self.days)
+            if self.hourly[hour] == 1:
+                _prune(self.hourly, self.hours)
+
+    def mark_live(self, path: Optional[str] = None) -> None:
+        """Фіксує межу історії перед першим голосом, що враховується наживо"""
+        if self.history_limit is None:
+            path = path or RATINGS_FILE
+            self.history_limit = os.path.getsize(path) if os.path.exists(path) else 0
+
+    def bootstrap(self, path: Optional[str] = None) -> None:
+        """
+        Завантажує історію оцінок з CSV при запуску. Історія спершу збирається
+        окремо і додається лише після успішного читання, тож повторний виклик
+        після помилки не рахує голоси двічі.
+        """
+        if self.bootstrapped:
+            return
+        path = path or RATINGS_FILE
+        history = RatingStats(self.days, self.hours)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = f.read() if self.history_limit is None else f.read(self.history_limit)
+            for row in csv.DictReader(io.StringIO(data.decode('utf-8'), newline='')):
+                rating = (row.get('rating') or '').strip()
+                if rating:
+                    history.add(rating, row.get('timestamp') or '')
+        with self._lock:
+            self.counts.update(history.counts)
+            self.daily.update(history.daily)
+            self.hourly.update(history.hourly)
+            _prune(self.daily, self.days)
+            _prune(self.hourly, self.hours)
+            self.total += history.total
+            self.stars_sum += history.stars_sum
+            self.stars_count += history.stars_count
+            self.bootstrapped = True
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Середня кількість зірочок або None, якщо оцінок ще немає"""
+        if not self.stars_count:
+            return None
+        return self.stars_sum / self.stars_count
+
+    def summary(self) -> Dict[str, Union[int, float, None, Dict[str, int]]]:
+        """Підсумкова статистика (не залежить від розміру історії)"""
+        with self._lock:
+            return {
+                "total": self.total,
+                "counts": dict(self.counts),
+                "mean": self.mean,
+                "likes": self.counts['👍'],
+                "dislikes": self.counts['👎'],
+                # Голоси за останні дні та години
+                "daily": dict(sorted(self.daily.items())),
+                "hourly": dict(sorted(self.hourly.items())),
+            }
+
+# Спільна для всього процесу статистика оцінок
+rating_stats = RatingStats()
+
+class RatingsWriter:
+    """Буферизований запис оцінок: голоси накопичуються в пам'яті й записуються пакетами у фоні"""
+
+    def __init__(self, path: str = RATINGS_FILE, batch_size: int = RATINGS_BATCH_SIZE,
+                 flush_interval: float = RATINGS_FLUSH_INTERVAL,
+                 stats: Optional[RatingStats] = None):
+        self.path = path
+        self.stats = stats
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: List[Tuple[int, str, str]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self.recorded = 0
+        self.written = 0
+
+    def record(self, user_id: int, rating: str) -> None:
+        """Додає оцінку в буфер (без звернення до диска)"""
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        if self.stats is not None:
+            # Межа фіксується до того, як голос потрапить у CSV
+            self.stats.mark_live(self.path)
+            self.stats.add(str(rating), timestamp)
+        self._buffer.append((user_id, timestamp, str(rating)))
+        self.recorded += 1
+        if len(self._buffer) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self) -> asyncio.Task:
+        """Запускає фонову задачу запису"""
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logging.error(f"Error saving ratings: {e}")
+
+    def _write_rows(self, rows: List[Tuple[int, str, str]], sync: bool) -> None:
+        """Дописує пакет оцінок у CSV (виконується поза циклом подій)"""
+        ensure_ratings_file(self.path)
+        with open(self.path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerows(rows)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+
+    async def flush(self, sync: bool = False) -> None:
+        """Записує накопичені оцінки; sync=True додатково викликає fsync"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            if not self._buffer:
+                return
+            rows, self._buffer = self._buffer, []
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self._write_rows, rows, sync)
+            except Exception:
+                # Повертаємо оцінки в буфер, щоб не втратити їх
+                self._buffer[:0] = rows
+                raise
+            self.written += len(rows)
+
+    async def close(self) -> None:
+        """Зупиняє фонову задачу та синхронно скидає залишок буфера на диск"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await self.flush(sync=True)
+        except Exception as e:
+            logging.error(f"Error saving ratings on shutdown: {e}")
+
+# Спільний для всього процесу буфер оцінок
+ratings_writer = RatingsWriter(stats=rating_stats)
+
+def get_stats() -> Dict[str, Union[int, float, None, Dict[str, int]]]:
+    """Повертає статистику оцінок: кількість за кожною оцінкою, загальну кількість і середнє."""
     try:
-        ensure_ratings_file()
-        likes = dislikes = 0
-        
-        with open(RATINGS_FILE, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row['rating'] == '👍':
-                    likes += 1
-                elif row['rating'] == '👎':
-                    dislikes += 1
-                    
-        return likes, dislikes
+        if not rating_stats.bootstrapped:
+            rating_stats.bootstrap()
+        return rating_stats.summary()
     except Exception as e:
         logging.error(f"Error getting stats: {e}")
-        return 0, 0
+        return {"total": 0, "counts": {}, "mean": None, "likes": 0, "dislikes": 0, "daily": {}, "hourly": {}}
 
 def is_admin(user_id: int) -> bool:
     """Перевіряє, чи є користувач адміністратором."""
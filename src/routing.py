@@ -0,0 +1,126 @@
+"""
+Модуль з таблицею маршрутизації кнопок до обробників.
+"""
+
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, Iterable, Mapping, Optional, Tuple, Union
+
+from aiogram import types
+from aiogram.filters import Filter
+from aiogram.fsm.context import FSMContext
+
+from .handlers import (
+    handle_main_menu,
+    handle_yaware_menu,
+    handle_other_programs,
+    handle_admin_request
+)
+
+ButtonHandler = Callable[[types.Message, FSMContext], Awaitable[Any]]
+# (стан FSM або None для будь-якого стану, текст кнопки)
+RouteKey = Tuple[Optional[str], str]
+
+# Кнопки, які обробляє кожен обробник
+HANDLER_BUTTONS = (
+    (handle_main_menu, (
+        "📥 Установить трекер",
+        "✅ Я уже установил",
+        "🔧 Другие программы",
+        "❓ Нужна помощь админа"
+    )),
+    (handle_yaware_menu, (
+        "🪟 Windows",
+        "🍎 MacOS",
+        "🌐 Плагин",
+        "❓ Нужна помощь админа",
+        "✅ Я уже установил",
+        "⬅️ Назад"
+    )),
+    (handle_other_programs, (
+        "1️⃣", "2️⃣", "3️⃣", "4️⃣", "5️⃣", "6️⃣",
+        "🏠 Главное меню",
+        "❓ Нужна помощь админа"
+    )),
+    (handle_admin_request, (
+        "📨 Отправить запрос",
+        "👨‍💻 Обратиться к админу",
+        "🔧 Другие программы",
+        "⬅️ Назад"
+    )),
+)
+
+# Кнопки, які заявлені кількома обробниками, і хто з них насправді їх обробляє.
+# Раніше це неявно визначалося порядком реєстрації фільтрів.
+BUTTON_OWNERS: Dict[str, ButtonHandler] = {
+    "❓ Нужна помощь админа": handle_main_menu,
+    "✅ Я уже установил": handle_main_menu,
+    "🔧 Другие программы": handle_main_menu,
+    "⬅️ Назад": handle_yaware_menu,
+}
+
+# Маршрути, що діють лише в певному стані FSM: (стан, текст) -> обробник
+STATE_BUTTON_ROUTES: Dict[RouteKey, ButtonHandler] = {}
+
+def build_routes(
+    handler_buttons: Iterable[Tuple[ButtonHandler, Iterable[str]]],
+    owners: Mapping[str, ButtonHandler],
+    state_routes: Mapping[RouteKey, ButtonHandler]
+) -> Mapping[RouteKey, ButtonHandler]:
+    """Будує незмінну таблицю маршрутів і перевіряє, що неоднозначностей немає"""
+    claimants: Dict[str, list] = {}
+    for handler, buttons in handler_buttons:
+        for text in buttons:
+            claimants.setdefault(text, []).append(handler)
+
+    routes: Dict[RouteKey, ButtonHandler] = {}
+    for text, handlers in claimants.items():
+        if len(handlers) == 1:
+            routes[(None, text)] = handlers[0]
+            continue
+        owner = owners.get(text)
+        if owner is None:
+            names = ", ".join(handler.__name__ for handler in handlers)
+            raise ValueError(f"Button {text!r} is claimed by several handlers ({names}) without an owner")
+        if owner not in handlers:
+            raise ValueError(f"Owner of button {text!r} does not handle it: {owner.__name__}")
+        routes[(None, text)] = owner
+
+    routes.update(state_routes)
+    return MappingProxyType(routes)
+
+# Таблиця маршрутів будується один раз під час імпорту
+BUTTON_ROUTES = build_routes(HANDLER_BUTTONS, BUTTON_OWNERS, STATE_BUTTON_ROUTES)
+
+def resolve_button(
+    text: Optional[str],
+    state: Optional[str] = None,
+    routes: Mapping[RouteKey, ButtonHandler] = BUTTON_ROUTES
+) -> Optional[ButtonHandler]:
+    """Повертає обробник для кнопки: спершу маршрут для стану, потім загальний"""
+    if text is None:
+        return None
+    if state is not None:
+        handler = routes.get((state, text))
+        if handler is not None:
+            return handler
+    return routes.get((None, text))
+
+class ButtonFilter(Filter):
+    """Фільтр, що пропускає лише відомі кнопки і передає обробник у button_handler"""
+
+    def __init__(self, routes: Mapping[RouteKey, ButtonHandler] = BUTTON_ROUTES):
+        self.routes = routes
+
+    async def __call__(
+        self,
+        message: types.Message,
+        raw_state: Optional[str] = None
+    ) -> Union[bool, Dict[str, Any]]:
+        handler = resolve_button(message.text, raw_state, self.routes)
+        if handler is None:
+            return False
+        return {"button_handler": handler}
+
+async def dispatch_button(message: types.Message, state: FSMContext, button_handler: ButtonHandler):
+    """Передає натискання кнопки обробнику, знайденому в таблиці маршрутів"""
+    await button_handler(message, state)
@@ -0,0 +1,96 @@
+"""
+Модуль з виправленням опечаток у словах запиту (symmetric delete, як у SymSpell).
+"""
+
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """Усі варіанти слова з видаленими не більше ніж max_distance літерами"""
+    variants = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {
+            variant[:i] + variant[i + 1:]
+            for variant in frontier
+            for i in range(len(variant))
+        }
+        variants |= frontier
+    return variants
+
+def edit_distance(first: str, second: str, limit: int) -> int:
+    """Відстань Дамерау-Левенштейна (з перестановками сусідніх літер); limit + 1, якщо більша за limit"""
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(second) + 1))
+    for i in range(1, len(first) + 1):
+        current = [i] + [0] * len(second)
+        for j in range(1, len(second) + 1):
+            cost = 0 if first[i - 1] == second[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and first[i - 1] == second[j - 2] and first[i - 2] == second[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+class SpellingIndex:
+    """
+    Словник видалень: кожне слово словника записується під усіма своїми
+    варіантами без 1..max_distance літер. Для слова запиту генеруються такі
+    самі варіанти, тож кандидати знаходяться за кілька звернень до словника,
+    незалежно від розміру словника.
+    """
+
+    # Слова з трьох літер не виправляємо ("как" не повинно стати "мак"),
+    # короткі слова - лише на одну літеру
+    MIN_WORD_LENGTH = 4
+    SHORT_WORD_LENGTH = 5
+
+    def __init__(self, frequencies: Mapping[str, int], max_distance: int = 2,
+                 deletes: Optional[Mapping[str, Sequence[str]]] = None):
+        self.frequencies = frequencies
+        self.max_distance = max_distance
+        # варіант з видаленими літерами -> слова словника (готовий - зі скомпільованого індексу)
+        if deletes is None:
+            built: Dict[str, List[str]] = {}
+            for word in frequencies:
+                for variant in _deletes(word, self.max_distance_for(word)):
+                    built.setdefault(variant, []).append(word)
+            deletes = built
+        self.deletes: Mapping[str, Sequence[str]] = deletes
+
+    def __len__(self) -> int:
+        return len(self.frequencies)
+
+    def max_distance_for(self, word: str) -> int:
+        if len(word) < self.MIN_WORD_LENGTH:
+            return 0
+        if len(word) <= self.SHORT_WORD_LENGTH:
+            return min(1, self.max_distance)
+        return self.max_distance
+
+    def candidates(self, word: str) -> Iterable[str]:
+        """Слова словника, що можуть бути на відстані не більше max_distance"""
+        seen: Set[str] = set()
+        for variant in _deletes(word, self.max_distance_for(word)):
+            for candidate in self.deletes.get(variant, ()):
+                if candidate not in seen:
+                    seen.add(candidate)
+                    yield candidate
+
+    def correct(self, word: str) -> Optional[str]:
+        """Найближче слово словника (при рівній відстані - найчастіше) або None"""
+        if word in self.frequencies:
+            return word
+        best: Optional[str] = None
+        best_key = (self.max_distance + 1, 0)
+        for candidate in self.candidates(word):
+            # Допустима відстань - менша з допустимих для обох слів
+            limit = min(self.max_distance_for(word), self.max_distance_for(candidate))
+            distance = edit_distance(word, candidate, limit)
+            key = (distance, -self.frequencies[candidate])
+            if distance <= limit and key < best_key:
+                best, best_key = candidate, key
+        return best
@@ -0,0 +1,279 @@
+"""
+Модуль з постійним FSM-сховищем на базі SQLite.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+
+from .config import (
+    FSM_STORAGE,
+    FSM_DB_PATH,
+    FSM_STATE_TTL,
+    FSM_CACHE_SIZE,
+    FSM_FLUSH_INTERVAL
+)
+
+class StorageRecord:
+    """Стан і дані однієї розмови"""
+
+    __slots__ = ("state", "data", "updated_at")
+
+    def __init__(self, state: Optional[str] = None, data: Optional[Dict[str, Any]] = None,
+                 updated_at: float = 0.0):
+        self.state = state
+        self.data = data if data is not None else {}
+        self.updated_at = updated_at
+
+    def is_empty(self) -> bool:
+        return self.state is None and not self.data
+
+class SQLiteStorage(BaseStorage):
+    """
+    FSM-сховище в SQLite (режим WAL) з LRU-кешем у пам'яті та відкладеним записом.
+
+    Зміни спочатку потрапляють у кеш і буфер запису, а фонова задача періодично
+    скидає їх у базу одним пакетом. Розмови, які не змінювалися довше state_ttl
+    секунд, видаляються з кешу та з бази.
+    """
+
+    def __init__(self, path: Path, state_ttl: float = FSM_STATE_TTL,
+                 cache_size: int = FSM_CACHE_SIZE, flush_interval: float = FSM_FLUSH_INTERVAL):
+        self.path = Path(path)
+        self.state_ttl = state_ttl
+        self.cache_size = cache_size
+        self.flush_interval = flush_interval
+        # Усі звернення до SQLite виконуються в одному окремому потоці
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fsm-sqlite")
+        self._connection: Optional[sqlite3.Connection] = None
+        self._cache: "OrderedDict[str, StorageRecord]" = OrderedDict()
+        # Буфер відкладеного запису: ключ -> запис (None означає видалення)
+        self._pending: Dict[str, Optional[StorageRecord]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # Створюється в циклі подій при першому скиданні (Python 3.8/3.9 прив'язують Lock до циклу)
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._last_sweep = 0.0
+        # Кількість розмов у базі на момент останнього прибирання (для метрик)
+        self.stored_count: Optional[int] = None
+        self._closed = False
+
+    @staticmethod
+    def _make_key(key: StorageKey) -> str:
+        return f"{key.bot_id}:{key.chat_id}:{key.user_id}:{key.thread_id or ''}:{key.destiny}"
+
+    # --- Операції з базою (виконуються в потоці сховища) ---
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.path), check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS fsm ("
+                "key TEXT PRIMARY KEY, state TEXT, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS fsm_updated_at ON fsm (updated_at)")
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _read(self, key: str) -> Optional[Tuple[Optional[str], str, float]]:
+        return self._connect().execute(
+            "SELECT state, data, updated_at FROM fsm WHERE key = ?", (key,)
+        ).fetchone()
+
+    def _write_batch(self, upserts: List[Tuple[str, Optional[str], str, float]],
+                     deletes: List[Tuple[str]], expired_before: Optional[float],
+                     recount: bool) -> Optional[int]:
+        connection = self._connect()
+        with connection:
+            if upserts:
+                connection.executemany(
+                    "INSERT INTO fsm (key, state, data, updated_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET state = excluded.state, "
+                    "data = excluded.data, updated_at = excluded.updated_at",
+                    upserts
+                )
+            if deletes:
+                connection.executemany("DELETE FROM fsm WHERE key = ?", deletes)
+            if expired_before is not None:
+                connection.execute("DELETE FROM fsm WHERE updated_at < ?", (expired_before,))
+        return self._count() if recount else None
+
+    def _count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM fsm").fetchone()[0]
+
+    def _close_connection(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    # --- Кеш і відкладений запис ---
+
+    def _is_expired(self, record: StorageRecord, now: float) -> bool:
+        return self.state_ttl > 0 and record.updated_at < now - self.state_ttl
+
+    async def _get_record(self, key: StorageKey) -> StorageRecord:
+        storage_key = self._make_key(key)
+        now = time.time()
+        record = self._cache.get(storage_key)
+        if record is not None:
+            self._cache.move_to_end(storage_key)
+        elif storage_key in self._pending:
+            record = self._pending[storage_key] or StorageRecord()
+            self._remember(storage_key, record)
+        else:
+            row = await self._run(self._read, storage_key)
+            # Поки чекали на базу, запис міг з'явитися в кеші
+            record = self._cache.get(storage_key)
+            if record is None:
+                if row is None:
+                    record = StorageRecord()
+                else:
+                    record = StorageRecord(row[0], json.loads(row[1]), row[2])
+                self._remember(storage_key, record)
+
+        if not record.is_empty() and self._is_expired(record, now):
+            record = StorageRecord()
+            self._remember(storage_key, record)
+            self._pending[storage_key] = None
+        return record
+
+    def _remember(self, storage_key: str, record: StorageRecord) -> None:
+        """Кладе запис у кеш, витісняючи найдавніші записи"""
+        self._cache[storage_key] = record
+        self._cache.move_to_end(storage_key)
+        while len(self._cache) > self.cache_size:
+            # Незаписані зміни лишаються в буфері, тож витіснення їх не втрачає
+            self._cache.popitem(last=False)
+
+    async def _put(self, key: StorageKey, record: StorageRecord) -> None:
+        storage_key = self._make_key(key)
+        record.updated_at = time.time()
+        self._remember(storage_key, record)
+        self._pending[storage_key] = None if record.is_empty() else record
+        self._ensure_flusher()
+        if len(self._pending) >= self.cache_size:
+            await self.flush()
+
+    def _ensure_flusher(self) -> None:
+        if self._flush_task is None and not self._closed:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logging.error(f"Error flushing FSM storage: {e}")
+
+    async def flush(self) -> None:
+        """Записує накопичені зміни в базу та видаляє застарілі розмови"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            upserts = []
+            deletes = []
+            for storage_key, record in list(self._pending.items()):
+                if record is None:
+                    deletes.append((storage_key,))
+                    continue
+                # Серіалізуємо в циклі подій, щоб потік бази не бачив змін "на льоту"
+                try:
+                    data = json.dumps(record.data, ensure_ascii=False)
+                except (TypeError, ValueError) as e:
+                    # Такий запис ніколи не запишеться: лишаємо його лише в кеші,
+                    # щоб він не блокував решту пакета
+                    logging.error(f"FSM data for {storage_key} is not JSON-serializable: {e}")
+                    del self._pending[storage_key]
+                    continue
+                upserts.append((storage_key, record.state, data, record.updated_at))
+            # Буфер забираємо лише після серіалізації, щоб помилка не втратила пакет
+            pending, self._pending = self._pending, {}
+
+            now = time.time()
+            expired_before = None
+            # Прибирання застарілих розмов і перерахунок виконуються рідше за запис
+            sweep = now - self._last_sweep >= self.flush_interval * 10
+            if sweep:
+                self._last_sweep = now
+                if self.state_ttl > 0:
+                    expired_before = now - self.state_ttl
+                    for storage_key in [k for k, r in self._cache.items() if self._is_expired(r, now)]:
+                        del self._cache[storage_key]
+
+            if not upserts and not deletes and not sweep:
+                return
+            try:
+                stored_count = await self._run(self._write_batch, upserts, deletes, expired_before, sweep)
+            except BaseException:
+                # Повертаємо зміни в буфер, якщо новіші ще не з'явилися (зокрема при
+                # скасуванні задачі під час close: повторний запис тих самих змін безпечний)
+                for storage_key, record in pending.items():
+                    self._pending.setdefault(storage_key, record)
+                raise
+            if stored_count is not None:
+                self.stored_count = stored_count
+
+    def cache_len(self) -> int:
+        """Кількість розмов у кеші пам'яті"""
+        return len(self._cache)
+
+    async def count(self) -> int:
+        """Кількість розмов, збережених у базі"""
+        await self.flush()
+        return await self._run(self._count)
+
+    # --- Інтерфейс BaseStorage ---
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        record = await self._get_record(key)
+        new_record = StorageRecord(state.state if isinstance(state, State) else state, record.data)
+        await self._put(key, new_record)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return (await self._get_record(key)).state
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        record = await self._get_record(key)
+        await self._put(key, StorageRecord(record.state, data.copy()))
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        return (await self._get_record(key)).data.copy()
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        try:
+            await self.flush()
+        except Exception as e:
+            logging.error(f"Error flushing FSM storage on close: {e}")
+        await self._run(self._close_connection)
+        self._executor.shutdown(wait=True)
+
+def create_storage() -> BaseStorage:
+    """Створює FSM-сховище відповідно до налаштування FSM_STORAGE"""
+    if FSM_STORAGE == "sqlite":
+        return SQLiteStorage(FSM_DB_PATH)
+    if FSM_STORAGE != "memory":
+        logging.warning(f"Unknown FSM_STORAGE={FSM_STORAGE!r}, falling back to memory storage")
+    from aiogram.fsm.storage.memory import MemoryStorage
+    return MemoryStorage()
@@ -0,0 +1,136 @@
+"""
+Модуль з лічильником номерів звернень.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from .config import TICKET_BLOCK_SIZE
+
+TICKET_FILE = Path(__file__).parent.parent / "data" / "ticket_counter.txt"
+
+class TicketCounter:
+    """
+    Лічильник номерів звернень, безпечний для кількох процесів.
+
+    У файлі зберігається найбільший зарезервований номер. Процес резервує
+    одразу блок номерів під файловим блокуванням і далі видає їх з пам'яті,
+    тож диск потрібен лише раз на block_size звернень. Невикористані номери
+    блоку після перезапуску пропускаються, але ніколи не видаються повторно.
+    """
+
+    def __init__(self, path: Path, block_size: int = TICKET_BLOCK_SIZE):
+        self.path = path
+        self.lock_path = path.with_name(path.name + ".lock")
+        self.block_size = max(1, block_size)
+        self._lock = threading.Lock()
+        self._next = 0
+        self._limit = -1
+        self.blocks_reserved = 0
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Ексклюзивне блокування між процесами"""
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a+b") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _read_reserved(self) -> int:
+        """Читає найбільший зарезервований номер"""
+        try:
+            text = self.path.read_text().strip()
+        except FileNotFoundError:
+            return 0
+        if not text:
+            return 0
+        try:
+            return int(text)
+        except ValueError:
+            # Не вгадуємо номер, щоб не видати його повторно
+            raise RuntimeError(f"Ticket counter file {self.path} is corrupted: {text!r}")
+
+    def _write_reserved(self, value: int) -> None:
+        """Атомарно записує новий зарезервований номер (тимчасовий файл + rename)"""
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            f.write(f"{value}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        if hasattr(os, "O_DIRECTORY"):
+            # Фіксуємо сам rename на диску
+            dir_fd = os.open(str(self.path.parent), os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+    def _reserve_block(self) -> None:
+        with self._file_lock():
+            reserved = self._read_reserved()
+            new_reserved = reserved + self.block_size
+            self._write_reserved(new_reserved)
+        self._next, self._limit = reserved + 1, new_reserved
+        self.blocks_reserved += 1
+
+    def next(self) -> int:
+        """Повертає наступний номер звернення"""
+        with self._lock:
+            if self._next > self._limit:
+                self._reserve_block()
+            number = self._next
+            self._next += 1
+            return number
+
+    def has_reserved(self) -> bool:
+        """Чи лишилися номери в зарезервованому блоці (видача без звернення до диска)"""
+        return self._next <= self._limit
+
+    @property
+    def last_issued(self) -> int:
+        """Останній виданий цим процесом номер (0, якщо ще не видавався)"""
+        return self._next - 1 if self.blocks_reserved else 0
+
+# Спільний для всього процесу лічильник
+ticket_counter = TicketCounter(TICKET_FILE)
+
+def get_next_ticket_number() -> int:
+    """Повертає наступний номер звернення"""
+    try:
+        return ticket_counter.next()
+    except Exception as e:
+        logging.error(f"Error in get_next_ticket_number: {e}")
+        # 0 означає "без номера": повторно видавати вже використаний номер не можна
+        return 0
+
+async def next_ticket_number() -> int:
+    """
+    Те саме, що get_next_ticket_number, для обробників: резервування нового блоку
+    (блокування файлу, яке може чекати на інший процес, і fsync) виконується поза циклом подій.
+    """
+    if ticket_counter.has_reserved():
+        return get_next_ticket_number()
+    return await asyncio.get_running_loop().run_in_executor(None, get_next_ticket_number)
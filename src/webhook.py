@@ -0,0 +1,111 @@
+"""
+Модуль з режимом роботи через вебхук (вбудований aiohttp-сервер).
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler
+
+from .config import (
+    WEBHOOK_URL,
+    WEBHOOK_PATH,
+    WEBHOOK_HOST,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET,
+    WEBHOOK_MAX_CONNECTIONS,
+    HEALTH_PATH
+)
+
+class BoundedRequestHandler(SimpleRequestHandler):
+    """Обробник вебхука, що обмежує кількість оновлень, які обробляються одночасно"""
+
+    def __init__(self, dispatcher: Dispatcher, bot: Bot, max_concurrent_updates: int,
+                 secret_token: Optional[str] = None):
+        # Оновлення обробляються в межах запиту, тож семафор справді обмежує навантаження
+        super().__init__(dispatcher, bot, handle_in_background=False, secret_token=secret_token)
+        self.max_concurrent_updates = max_concurrent_updates
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.rejected = 0
+
+    async def handle(self, request: web.Request) -> web.Response:
+        # Перевіряємо секрет до того, як займати місце в черзі
+        if not self.verify_secret(request.headers.get("X-Telegram-Bot-Api-Secret-Token", ""), self.bot):
+            self.rejected += 1
+            return web.Response(body="Unauthorized", status=401)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_updates)
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                return await self._handle_request(bot=self.bot, request=request)
+            finally:
+                self.in_flight -= 1
+
+def add_health_route(app: web.Application, mode: str) -> None:
+    """Додає ендпоінт перевірки стану процесу"""
+    started_at = time.time()
+
+    async def health(request: web.Request) -> web.Response:
+        return web.json_response({
+            "status": "ok",
+            "mode": mode,
+            "uptime": round(time.time() - started_at, 3),
+        })
+
+    app.router.add_get(HEALTH_PATH, health)
+
+def build_webhook_app(dispatcher: Dispatcher, bot: Bot, secret_token: str) -> web.Application:
+    """Створює aiohttp-застосунок з вебхуком і ендпоінтом перевірки стану"""
+    app = web.Application()
+    handler = BoundedRequestHandler(
+        dispatcher,
+        bot,
+        max_concurrent_updates=WEBHOOK_MAX_CONNECTIONS,
+        secret_token=secret_token
+    )
+    handler.register(app, path=WEBHOOK_PATH)
+    add_health_route(app, mode="webhook")
+    # Метрики не публікуються на публічному сервері вебхука: для них є окремий
+    # сервер на METRICS_HOST:METRICS_PORT (див. start_metrics_server)
+    return app
+
+def check_webhook_config() -> None:
+    """Перевіряє обов'язкові налаштування вебхука (RuntimeError, якщо їх немає)"""
+    if not WEBHOOK_URL:
+        raise RuntimeError("WEBHOOK_URL must be set when BOT_MODE=webhook")
+    if not WEBHOOK_SECRET:
+        # Випадковий секрет у кожному процесі за балансувальником перезаписав би
+        # секрет інших процесів, і вони відхиляли б усі оновлення
+        raise RuntimeError("WEBHOOK_SECRET must be set when BOT_MODE=webhook (the same value for every process)")
+
+async def run_webhook(dispatcher: Dispatcher, bot: Bot) -> None:
+    """Запускає вбудований сервер, реєструє вебхук у Telegram і працює до скасування"""
+    check_webhook_config()
+    secret_token = WEBHOOK_SECRET
+
+    app = build_webhook_app(dispatcher, bot, secret_token)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, WEBHOOK_HOST, WEBHOOK_PORT)
+    await site.start()
+    logging.info(f"Webhook server listening on {WEBHOOK_HOST}:{WEBHOOK_PORT}{WEBHOOK_PATH}")
+
+    await dispatcher.emit_startup(bot=bot)
+    try:
+        await bot.set_webhook(
+            url=WEBHOOK_URL.rstrip("/") + WEBHOOK_PATH,
+            secret_token=secret_token,
+            max_connections=WEBHOOK_MAX_CONNECTIONS,
+            allowed_updates=dispatcher.resolve_used_update_types()
+        )
+        # Працюємо, доки задачу не скасують (сигнал завершення)
+        await asyncio.Event().wait()
+    finally:
+        await dispatcher.emit_shutdown(bot=bot)
+        await runner.cleanup()
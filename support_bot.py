@@ -9,96 +9,106 @@ Telegram бот для допомоги з встановленням прогр
 
 import asyncio
 import logging
+import logging.handlers
 import signal
 import sys
 from pathlib import Path
 from aiogram import Bot, Dispatcher, F
 from aiogram.filters.command import Command
-from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.fsm.storage.base import BaseStorage
+
+if __name__ == "__main__":
+    # Записи, що з'являються під час імпорту src (до setup_logging), накопичуються
+    # тут; setup_logging переносить їх у файл логу
+    logging.getLogger().addHandler(logging.handlers.BufferingHandler(10000))
+    logging.getLogger().setLevel(logging.DEBUG)
 
 from src import (
     BOT_TOKEN,
+    BOT_MODE,
+    METRICS_LOG_INTERVAL,
+    METRICS_ENABLED,
+    LOOP_LAG_INTERVAL,
+    faq_store,
+    shutdown_faq_executor,
+    ratings_writer,
+    rating_stats,
+    miss_log,
+    create_storage,
     COMMANDS,
     cmd_start,
     cmd_help,
-    handle_main_menu,
-    handle_yaware_menu,
     handle_help_request,
-    handle_admin_request,
-    handle_other_programs,
     handle_admin_reply,
-    handle_rating
+    handle_faq_choice,
+    handle_rating,
+    ButtonFilter,
+    dispatch_button,
+    run_webhook,
+    check_webhook_config,
+    setup_logging,
+    setup_metrics,
+    log_metrics,
+    monitor_loop_lag,
+    start_metrics_server,
+    setup_outbound
 )
 
-# Налаштування логування
-log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-logging.basicConfig(
-    level=logging.INFO,
-    format=log_format,
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler(
-            Path('data/support_bot.log').absolute(),
-            encoding='utf-8'
-        )
-    ]
-)
 logger = logging.getLogger(__name__)
 
-# Ensure required directories exist
-Path('data').mkdir(exist_ok=True)
-Path('images').mkdir(exist_ok=True)
-
-# Ініціалізація бота та диспетчера
-bot = Bot(token=BOT_TOKEN)
-storage = MemoryStorage()
-dp = Dispatcher(storage=storage)
-
-# Реєстрація обробників команд
-dp.message.register(cmd_start, Command("start"))
-dp.message.register(cmd_help, Command("help"))
-
-# Реєстрація обробників повідомлень
-dp.message.register(handle_main_menu, lambda message: message.text in [
-    "📥 Установить трекер",
-    "✅ Я уже установил",
-    "🔧 Другие программы",
-    "❓ Нужна помощь админа"
-])
-
-dp.message.register(handle_yaware_menu, lambda message: message.text in [
-    "🪟 Windows",
-    "🍎 MacOS",
-    "🌐 Плагин",
-    "❓ Нужна помощь админа",
-    "✅ Я уже установил",
-    "⬅️ Назад"
-])
-
-dp.message.register(handle_other_programs, lambda message: message.text in [
-    "1️⃣", "2️⃣", "3️⃣", "4️⃣", "5️⃣", "6️⃣",
-    "🏠 Главное меню",
-    "❓ Нужна помощь админа"
-])
-
-dp.message.register(handle_admin_request, lambda message: message.text in [
-    "📨 Отправить запрос",
-    "👨‍💻 Обратиться к админу",
-    "🔧 Другие программы",
-    "⬅️ Назад"
-])
-
-# Реєстрація обробника callback-кнопки відповіді
-dp.callback_query.register(handle_admin_reply, F.data.startswith("reply_"))
-
-# Реєстрація обробника callback-кнопок оцінки
-dp.callback_query.register(handle_rating, F.data.startswith("rate_"))
-
-# Всі інші повідомлення обробляються як запити на допомогу
-dp.message.register(handle_help_request)
-
-async def on_startup():
+# Фонові задачі, які треба зупинити при завершенні роботи
+background_tasks = []
+# Окремий сервер метрик (METRICS_ENABLED)
+metrics_runner = None
+
+def create_dispatcher(storage: BaseStorage) -> Dispatcher:
+    """Створює диспетчер і реєструє обробники"""
+    dp = Dispatcher(storage=storage)
+
+    # Реєстрація обробників команд
+    dp.message.register(cmd_start, Command("start"))
+    dp.message.register(cmd_help, Command("help"))
+
+    # Реєстрація обробників кнопок: один фільтр з таблицею "текст кнопки -> обробник"
+    dp.message.register(dispatch_button, ButtonFilter())
+
+    # Реєстрація обробника callback-кнопки відповіді
+    dp.callback_query.register(handle_admin_reply, F.data.startswith("reply_"))
+
+    # Реєстрація обробника callback-кнопок зі схожими питаннями FAQ
+    dp.callback_query.register(handle_faq_choice, F.data.startswith("faq_"))
+
+    # Реєстрація обробника callback-кнопок оцінки
+    dp.callback_query.register(handle_rating, F.data.startswith("rate_"))
+
+    # Всі інші повідомлення обробляються як запити на допомогу
+    dp.message.register(handle_help_request)
+    return dp
+
+async def on_startup(bot: Bot, storage: BaseStorage):
     """Дії при запуску бота"""
+    # Завантажуємо FAQ поза циклом подій та запускаємо відстеження змін файлу
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, faq_store.refresh)
+    background_tasks.append(asyncio.create_task(faq_store.watch()))
+    # Статистику оцінок зчитуємо з CSV один раз, далі вона оновлюється з кожним голосом
+    try:
+        await loop.run_in_executor(None, rating_stats.bootstrap)
+    except Exception as e:
+        logger.error(f"Error loading rating stats: {e}")
+    ratings_writer.start()
+    miss_log.start()
+    if METRICS_LOG_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(log_metrics(METRICS_LOG_INTERVAL)))
+    if LOOP_LAG_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(monitor_loop_lag(LOOP_LAG_INTERVAL)))
+    if METRICS_ENABLED:
+        global metrics_runner
+        try:
+            metrics_runner = await start_metrics_server(storage)
+        except Exception as e:
+            logger.error(f"Error starting metrics server: {e}")
+
     try:
         # Встановлюємо команди бота
         await bot.set_my_commands(COMMANDS)
@@ -111,10 +121,22 @@ async def on_startup():
     except Exception as e:
         logger.error(f"Error setting commands: {e}")
 
-async def on_shutdown():
+async def on_shutdown(bot: Bot, storage: BaseStorage):
     """Дії при зупинці бота"""
     logger.info("Shutting down...")
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
+    global metrics_runner
+    if metrics_runner is not None:
+        await metrics_runner.cleanup()
+        metrics_runner = None
+    await ratings_writer.close()
+    await miss_log.close()
+    shutdown_faq_executor()
     try:
+        await storage.close()
         await bot.session.close()
         logger.info("Bot session closed")
     except Exception as e:
@@ -122,39 +144,65 @@ async def on_shutdown():
     finally:
         logger.info("Bye!")
 
-def handle_signals():
+def handle_signals(bot: Bot, storage: BaseStorage):
     """Обробка сигналів завершення"""
     loop = asyncio.get_event_loop()
     for sig in (signal.SIGTERM, signal.SIGINT):
         loop.add_signal_handler(
             sig,
-            lambda s=sig: asyncio.create_task(shutdown(sig=s))
+            lambda s=sig: asyncio.create_task(shutdown(s, bot, storage))
         )
 
-async def shutdown(sig: signal.Signals):
+async def shutdown(sig: signal.Signals, bot: Bot, storage: BaseStorage):
     """Graceful shutdown"""
     logger.info(f'Received signal {sig.name}...')
     tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
     [task.cancel() for task in tasks]
     logger.info(f'Cancelling {len(tasks)} outstanding tasks')
     await asyncio.gather(*tasks, return_exceptions=True)
-    await on_shutdown()
+    await on_shutdown(bot, storage)
     loop = asyncio.get_event_loop()
     loop.stop()
 
 async def main():
     """Головна функція"""
+    # Бот, сховище й диспетчер створюються лише тут, а не при імпорті: процеси пулу
+    # пошуку FAQ (spawn) імпортують цей модуль повторно і не повинні відкривати базу
+    bot = Bot(token=BOT_TOKEN)
+    storage = create_storage()
+    dp = create_dispatcher(storage)
+    # Вимірювання затримок оновлень, обробників і викликів Bot API (зовнішній middleware
+    # сесії, тож очікування ліміту й повтори рахуються як час Bot API), потім обмеження
+    # швидкості відправлення та повтор після 429
+    setup_metrics(dp, bot)
+    setup_outbound(bot)
     try:
         logger.info("Starting bot...")
-        handle_signals()
-        await on_startup()
-        await dp.start_polling(bot)
+        handle_signals(bot, storage)
+        if BOT_MODE == "webhook":
+            # Помилки налаштувань вебхука - до запуску фонових задач
+            check_webhook_config()
+        await on_startup(bot, storage)
+        if BOT_MODE == "webhook":
+            await run_webhook(dp, bot)
+        else:
+            # Вебхук, залишений попереднім запуском, заважає getUpdates
+            await bot.delete_webhook()
+            await dp.start_polling(bot)
     except Exception as e:
         logger.error(f"Error: {e}")
     finally:
-        await on_shutdown()
+        await on_shutdown(bot, storage)
 
 if __name__ == "__main__":
+    # Ensure required directories exist
+    Path('data').mkdir(exist_ok=True)
+    Path('images').mkdir(exist_ok=True)
+
+    # Налаштування логування: обробники лише ставлять записи в чергу,
+    # а запис на диск (з ротацією) виконує окремий потік. Лише тут, а не при
+    # імпорті: процеси пулу пошуку FAQ (spawn) імпортують цей модуль повторно
+    setup_logging(Path('data/support_bot.log').absolute())
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
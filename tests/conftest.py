@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Тести імпортують пакет src так само, як скрипти з каталогу scripts
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
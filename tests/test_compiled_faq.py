@@ -0,0 +1,89 @@
+import json
+import os
+
+import pytest
+
+from src.compiled_faq import CompiledFAQ, load_compiled_index, write_compiled_index
+from src.faq import FAQIndex, FAQStore
+from src.ranking import numpy_available
+
+FAQ = {
+    "Telegram не открывается": "Переустановите Telegram.",
+    "Telegram: не открывается": "Переустановите Telegram.",
+    "Telegram не отправляет сообщения": "Проверьте подключение к интернету.",
+    "Chrome открывает пустую вкладку": "Сбросьте настройки Chrome.",
+    "Как подключиться к AnyDesk": "Введите адрес рабочего места.",
+    "YaWare не запускается": "Перезапустите компьютер.",
+}
+QUERIES = [
+    "телеграм не открываеться",
+    "Telegram: не отправляет",
+    "хром пустая вкладка",
+    "как подключитса к анидеск",
+    "совсем другой вопрос",
+]
+ENGINES = ["substring", "tfidf"] if numpy_available() else ["substring"]
+
+def signature(path):
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+@pytest.fixture
+def faq_files(tmp_path):
+    faq_path = tmp_path / "faq.json"
+    faq_path.write_text(json.dumps(FAQ, ensure_ascii=False), encoding="utf-8")
+    index_path = tmp_path / "faq.index"
+    engine = "tfidf" if numpy_available() else "substring"
+    write_compiled_index(index_path, signature(faq_path), FAQIndex(FAQ, engine, max_edit_distance=2))
+    return faq_path, index_path
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_compiled_index_matches_json_index(faq_files, engine):
+    _, index_path = faq_files
+    built = FAQIndex(FAQ, engine, max_edit_distance=2)
+    compiled = FAQIndex({}, engine, max_edit_distance=2, compiled=CompiledFAQ(index_path))
+
+    assert list(compiled.keys) == list(built.keys)
+    assert dict(compiled.faq) == dict(built.faq)
+    assert compiled.generation == built.generation
+    assert compiled.duplicates == built.duplicates == 1
+    assert {word: list(ids) for word, ids in compiled.postings.items()} == built.postings
+    assert {part: list(words) for part, words in compiled.substrings.items()} == built.substrings
+    assert dict(compiled.spelling.deletes.items()) == built.spelling.deletes
+    for query in QUERIES:
+        assert compiled.search(query).matches == built.search(query).matches, query
+
+def test_other_edit_distance_builds_spelling_in_memory(faq_files):
+    _, index_path = faq_files
+    compiled = FAQIndex({}, max_edit_distance=1, compiled=CompiledFAQ(index_path))
+    assert isinstance(compiled.spelling.deletes, dict)
+    assert compiled.search("яваре не запускаеться").key == "YaWare не запускается"
+    assert FAQIndex({}, max_edit_distance=0, compiled=CompiledFAQ(index_path)).spelling is None
+
+def test_store_uses_compiled_index_while_it_is_current(faq_files):
+    faq_path, index_path = faq_files
+    store = FAQStore(faq_path, index_path=index_path)
+    store.refresh()
+    assert store.compiled
+    assert store.index.search("телеграм не открываеться").key == "Telegram не открывается"
+
+def test_stale_index_falls_back_to_json(faq_files):
+    faq_path, index_path = faq_files
+    changed = dict(FAQ, **{"Chrome не обновляется": "Скачайте новую версию."})
+    faq_path.write_text(json.dumps(changed, ensure_ascii=False), encoding="utf-8")
+    stat = faq_path.stat()
+    os.utime(faq_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert load_compiled_index(index_path, signature(faq_path)) is None
+    store = FAQStore(faq_path, index_path=index_path)
+    store.refresh()
+    assert not store.compiled
+    assert store.index.search("Chrome не обновляется").key == "Chrome не обновляется"
+
+def test_corrupted_index_falls_back_to_json(faq_files):
+    faq_path, index_path = faq_files
+    index_path.write_bytes(index_path.read_bytes()[:100])
+    store = FAQStore(faq_path, index_path=index_path)
+    store.refresh()
+    assert not store.compiled
+    assert len(store.index) == len(FAQ) - 1
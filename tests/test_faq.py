@@ -0,0 +1,65 @@
+from src.faq import FAQIndex, calculate_similarity, preprocess_text
+
+FAQ = {
+    "Telegram не открывается": "Переустановите Telegram.",
+    "Telegram не отправляет сообщения": "Проверьте подключение к интернету.",
+    "Chrome открывает пустую вкладку": "Сбросьте настройки Chrome.",
+    "Как подключиться к AnyDesk": "Введите адрес рабочего места.",
+    "YaWare не запускается": "Перезапустите компьютер.",
+}
+
+def test_typo_inside_a_longer_vocabulary_word_is_corrected():
+    index = FAQIndex(FAQ)
+    # "открываеться" містить "открывает" з іншого питання, але все одно виправляється
+    assert index.correct_words(preprocess_text("открываеться")) == ["открывается"]
+    result = index.search("телеграм не открываеться")
+    assert result.key == "Telegram не открывается"
+    assert result.score == 1.0
+
+def test_single_letter_typos_are_corrected():
+    index = FAQIndex(FAQ)
+    assert index.search("яваре не запускаеться").key == "YaWare не запускается"
+    assert index.search("как подключитса к анидеск").key == "Как подключиться к AnyDesk"
+
+def test_known_words_are_left_alone():
+    index = FAQIndex(FAQ)
+    words = preprocess_text("Telegram не отправляет сообщения")
+    assert index.correct_words(words) == words
+
+def test_correction_is_kept_only_when_it_scores_better():
+    index = FAQIndex(FAQ)
+    # "открыв" немає в словнику, але частковий збіг не гірший за виправлення
+    uncorrected = FAQIndex(FAQ, max_edit_distance=0)
+    assert index.search("chrome открыв").score == uncorrected.search("chrome открыв").score
+
+def test_correction_can_be_disabled():
+    index = FAQIndex(FAQ, max_edit_distance=0)
+    assert index.spelling is None
+    assert index.correct_words(["открываеться"]) == ["открываеться"]
+
+def test_index_scores_match_calculate_similarity():
+    index = FAQIndex(FAQ, max_edit_distance=0)
+    queries = [
+        "телеграм не открывается",
+        "не отправляет сообщения в телеграм",
+        "хром открывает пустую вкладку",
+        "как подключиться",
+        "подключение к интернету",
+        "запуск",
+        "совсем другой вопрос",
+    ]
+    for query in queries:
+        query_words = preprocess_text(query)
+        expected = {
+            key: calculate_similarity(query_words, preprocess_text(key)) for key in FAQ
+        }
+        expected = {key: score for key, score in expected.items() if score > 0}
+        result = index.search(query, k=len(FAQ))
+        assert {key: score for _, key, score in result.matches} == expected, query
+
+def test_ties_keep_file_order():
+    index = FAQIndex(FAQ, max_edit_distance=0)
+    result = index.search("telegram", k=2)
+    assert [key for _, key, _ in result.matches] == [
+        "Telegram не открывается", "Telegram не отправляет сообщения"
+    ]
@@ -0,0 +1,63 @@
+import asyncio
+
+from aiogram.methods import SendMessage
+
+from src.metrics import ApiTimingMiddleware, BotMetrics, UpdateTiming, current_update
+from src.outbound import OutboundLimiter, OutboundRateLimitMiddleware
+
+def test_overlapping_api_calls_are_not_summed():
+    timing = UpdateTiming()
+    timing.api_call_started(0.0)
+    timing.api_call_started(0.5)
+    timing.api_call_finished(1.0)
+    timing.api_call_finished(2.0)
+    timing.api_call_started(3.0)
+    timing.api_call_finished(3.5)
+    assert timing.api_calls == 3
+    assert timing.api_time == 2.5
+
+def test_concurrent_calls_through_middleware_count_wall_clock_time():
+    async def scenario():
+        metrics = BotMetrics()
+        middleware = ApiTimingMiddleware(metrics)
+
+        async def make_request(bot, method):
+            await asyncio.sleep(0.1)
+            return True
+
+        timing = UpdateTiming()
+        current_update.set(timing)
+        method = SendMessage(chat_id=1, text="test")
+        await asyncio.gather(*(middleware(make_request, None, method) for _ in range(5)))
+        return timing, metrics
+
+    timing, metrics = asyncio.run(scenario())
+    assert timing.api_calls == 5
+    assert metrics.api_calls["sendMessage"] == 5
+    assert 0.1 <= timing.api_time < 0.3
+
+def test_rate_limit_wait_counts_as_api_time():
+    async def scenario():
+        # Один токен на чат: другий виклик чекає на ліміт усередині таймінгу
+        limiter = OutboundLimiter(global_rate=100, global_burst=100, chat_rate=10, chat_burst=1,
+                                  group_rate=10, group_burst=1)
+        timing_middleware = ApiTimingMiddleware(BotMetrics())
+        limit_middleware = OutboundRateLimitMiddleware(limiter)
+
+        async def make_request(bot, method):
+            return True
+
+        async def call(bot, method):
+            return await timing_middleware(
+                lambda b, m: limit_middleware(make_request, b, m), bot, method
+            )
+
+        timing = UpdateTiming()
+        current_update.set(timing)
+        method = SendMessage(chat_id=1, text="test")
+        await call(None, method)
+        await call(None, method)
+        return timing
+
+    timing = asyncio.run(scenario())
+    assert timing.api_time >= 0.05
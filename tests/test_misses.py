@@ -0,0 +1,40 @@
+import asyncio
+import importlib.util
+from pathlib import Path
+
+from src.faq import MatchResult
+from src.misses import MissLogWriter
+
+def load_cluster_script():
+    path = Path(__file__).resolve().parent.parent / "scripts" / "cluster_faq_misses.py"
+    spec = importlib.util.spec_from_file_location("cluster_faq_misses", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def write_misses(writer: MissLogWriter, queries):
+    async def scenario():
+        for query in queries:
+            writer.record(query, MatchResult("", [], {}))
+            await writer.flush()
+
+    asyncio.run(scenario())
+
+def test_log_rotates_by_size(tmp_path):
+    path = tmp_path / "faq_misses.jsonl"
+    writer = MissLogWriter(str(path), max_bytes=300, backup_count=2)
+    write_misses(writer, [f"не работает программа номер {i}" for i in range(20)])
+
+    assert path.stat().st_size <= 300
+    assert (tmp_path / "faq_misses.jsonl.1").exists()
+    assert (tmp_path / "faq_misses.jsonl.2").exists()
+    assert not (tmp_path / "faq_misses.jsonl.3").exists()
+
+def test_cluster_script_reads_rotated_files_oldest_first(tmp_path):
+    path = tmp_path / "faq_misses.jsonl"
+    writer = MissLogWriter(str(path), max_bytes=1000, backup_count=5)
+    queries = [f"не работает программа номер {i}" for i in range(8)]
+    write_misses(writer, queries)
+
+    script = load_cluster_script()
+    assert [entry["query"] for entry in script.load_misses(path)] == queries
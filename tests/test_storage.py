@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+
+from src.storage import SQLiteStorage
+
+KEY = StorageKey(bot_id=1, chat_id=2, user_id=3)
+OTHER_KEY = StorageKey(bot_id=1, chat_id=4, user_id=5)
+
+def make_storage(tmp_path, **kwargs):
+    # Великий інтервал: фонова задача не скидає зміни сама, лише flush у тесті
+    return SQLiteStorage(tmp_path / "fsm.sqlite3", flush_interval=3600, **kwargs)
+
+def test_changes_are_written_behind_and_restored(tmp_path):
+    async def scenario():
+        storage = make_storage(tmp_path)
+        await storage.set_state(KEY, "Form:question")
+        await storage.set_data(KEY, {"user_message": "не открывается"})
+        # До скидання зміни лише в кеші та буфері
+        assert await storage._run(storage._read, storage._make_key(KEY)) is None
+        await storage.flush()
+        assert await storage._run(storage._read, storage._make_key(KEY)) is not None
+        await storage.close()
+
+        restored = make_storage(tmp_path)
+        assert await restored.get_state(KEY) == "Form:question"
+        assert await restored.get_data(KEY) == {"user_message": "не открывается"}
+        await restored.close()
+
+    asyncio.run(scenario())
+
+def test_cleared_conversation_is_deleted(tmp_path):
+    async def scenario():
+        storage = make_storage(tmp_path)
+        await storage.set_state(KEY, "Form:question")
+        await storage.flush()
+        await storage.set_state(KEY, None)
+        await storage.close()
+
+        restored = make_storage(tmp_path)
+        assert await restored.count() == 0
+        assert await restored.get_state(KEY) is None
+        await restored.close()
+
+    asyncio.run(scenario())
+
+def test_failed_write_keeps_pending_changes(tmp_path):
+    async def scenario():
+        storage = make_storage(tmp_path)
+        await storage.set_data(KEY, {"step": 1})
+
+        write_batch = storage._write_batch
+
+        def failing_write(*args):
+            raise OSError("disk full")
+
+        storage._write_batch = failing_write
+        with pytest.raises(OSError):
+            await storage.flush()
+        storage._write_batch = write_batch
+
+        await storage.close()
+        restored = make_storage(tmp_path)
+        assert await restored.get_data(KEY) == {"step": 1}
+        await restored.close()
+
+    asyncio.run(scenario())
+
+def test_unserializable_data_does_not_block_the_batch(tmp_path):
+    async def scenario():
+        storage = make_storage(tmp_path)
+        await storage.set_data(KEY, {"bad": object()})
+        await storage.set_data(OTHER_KEY, {"good": True})
+        await storage.flush()
+        assert not storage._pending
+        # Незаписаний запис лишається доступним з кешу
+        assert "bad" in await storage.get_data(KEY)
+        await storage.close()
+
+        restored = make_storage(tmp_path)
+        assert await restored.get_data(OTHER_KEY) == {"good": True}
+        assert await restored.get_data(KEY) == {}
+        await restored.close()
+
+    asyncio.run(scenario())
+
+def test_expired_conversation_is_dropped(tmp_path):
+    async def scenario():
+        storage = make_storage(tmp_path, state_ttl=60)
+        await storage.set_state(KEY, "Form:question")
+        storage._cache[storage._make_key(KEY)].updated_at -= 120
+        assert await storage.get_state(KEY) is None
+        await storage.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,48 @@
+import multiprocessing
+from pathlib import Path
+
+import pytest
+
+from src.tickets import TicketCounter
+
+def issue_tickets(path: str, block_size: int, count: int, results) -> None:
+    counter = TicketCounter(Path(path), block_size)
+    results.put([counter.next() for _ in range(count)])
+
+def test_numbers_are_unique_across_processes(tmp_path):
+    path = tmp_path / "ticket_counter.txt"
+    # fork швидший (без повторного імпорту src); на Windows його немає
+    method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(method)
+    results = context.Queue()
+    processes = [
+        context.Process(target=issue_tickets, args=(str(path), block_size, 50, results))
+        for block_size in (1, 3, 7, 10)
+    ]
+    for process in processes:
+        process.start()
+    numbers = [number for _ in processes for number in results.get(timeout=60)]
+    for process in processes:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    assert len(numbers) == len(set(numbers)) == 200
+    assert min(numbers) == 1
+
+def test_restart_skips_the_rest_of_the_block(tmp_path):
+    path = tmp_path / "ticket_counter.txt"
+    first = TicketCounter(path, block_size=10)
+    assert [first.next() for _ in range(3)] == [1, 2, 3]
+    assert first.last_issued == 3
+
+    # Новий процес не видає номери з блоку попереднього
+    second = TicketCounter(path, block_size=10)
+    assert second.last_issued == 0
+    assert second.next() == 11
+    assert path.read_text().strip() == "20"
+
+def test_corrupted_counter_file_is_not_guessed(tmp_path):
+    path = tmp_path / "ticket_counter.txt"
+    path.write_text("not a number")
+    with pytest.raises(RuntimeError):
+        TicketCounter(path).next()